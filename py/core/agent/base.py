@@ -6,7 +6,7 @@ from abc import ABCMeta
 from typing import AsyncGenerator, Optional, Tuple
 
 from core.base import AsyncSyncMeta, LLMChatCompletion, Message, syncable
-from core.base.agent import Agent, Conversation
+from core.base.agent import Agent, Conversation, ToolResult
 from core.utils import (
     CitationTracker,
     SearchResultsCollector,
@@ -14,6 +14,7 @@ from core.utils import (
     convert_nonserializable_objects,
     dump_obj,
     find_new_citation_spans,
+    next_citation_scan_offset,
 )
 
 logger = logging.getLogger()
@@ -97,6 +98,60 @@ class R2RAgent(Agent, metaclass=CombinedMeta):
         self._completed = False
         self.conversation = Conversation()
 
+    async def _execute_tool_calls(
+        self,
+        calls_list: list[dict],
+        *args,
+        return_exceptions: bool = False,
+        **kwargs,
+    ) -> list[ToolResult | BaseException]:
+        """
+        Execute all tool calls requested in a single assistant turn.
+
+        Each entry of `calls_list` holds `name`, `arguments` and
+        `tool_call_id`. Tools are IO-bound (search, web requests), so when
+        `config.parallel_tool_calls` is enabled they are dispatched
+        concurrently and the turn waits only on the slowest call.
+        Results are returned in the same order as `calls_list`.
+
+        Args:
+            calls_list: The tool calls to execute
+            return_exceptions: If True, exceptions are returned in place of
+                the corresponding result instead of being raised
+
+        Returns:
+            A list of ToolResult objects (or exceptions), one per call
+        """
+
+        def _call(c: dict):
+            return self.handle_function_or_tool_call(
+                c["name"],
+                c["arguments"],
+                tool_id=c["tool_call_id"],
+                *args,
+                **kwargs,
+            )
+
+        if getattr(self.config, "parallel_tool_calls", True):
+            results = await asyncio.gather(
+                *[_call(c) for c in calls_list], return_exceptions=True
+            )
+        else:
+            results = []
+            for c in calls_list:
+                try:
+                    results.append(await _call(c))
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results.append(e)
+
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+        return list(results)
+
     @syncable
     async def arun(
         self,
@@ -175,15 +230,19 @@ class R2RAgent(Agent, metaclass=CombinedMeta):
                     )
                     await self.conversation.add_message(assistant_msg)
 
-                    # If there are multiple tool_calls, call them sequentially here
-                    for tool_call in message.tool_calls:
-                        await self.handle_function_or_tool_call(
-                            tool_call.function.name,
-                            tool_call.function.arguments,
-                            tool_id=tool_call.id,
-                            *args,
-                            **kwargs,
-                        )
+                    # If there are multiple tool_calls, run them together
+                    await self._execute_tool_calls(
+                        [
+                            {
+                                "tool_call_id": tool_call.id,
+                                "name": tool_call.function.name,
+                                "arguments": tool_call.function.arguments,
+                            }
+                            for tool_call in message.tool_calls
+                        ],
+                        *args,
+                        **kwargs,
+                    )
                 else:
                     await self.conversation.add_message(
                         Message(role="assistant", content=message.content)
@@ -338,14 +397,18 @@ class R2RAgent(Agent, metaclass=CombinedMeta):
 
                 # Process the tool calls
                 if message.tool_calls:
-                    for tool_call in message.tool_calls:
-                        await self.handle_function_or_tool_call(
-                            tool_call.function.name,
-                            tool_call.function.arguments,
-                            tool_id=tool_call.id,
-                            *args,
-                            **kwargs,
-                        )
+                    await self._execute_tool_calls(
+                        [
+                            {
+                                "tool_call_id": tool_call.id,
+                                "name": tool_call.function.name,
+                                "arguments": tool_call.function.arguments,
+                            }
+                            for tool_call in message.tool_calls
+                        ],
+                        *args,
+                        **kwargs,
+                    )
 
 
 class R2RStreamingAgent(R2RAgent):
@@ -395,6 +458,7 @@ class R2RStreamingAgent(R2RAgent):
         async def sse_generator() -> AsyncGenerator[str, None]:
             pending_tool_calls = {}
             partial_text_buffer = ""
+            citation_scan_offset = 0
             iterations_count = 0
 
             try:
@@ -452,7 +516,12 @@ class R2RStreamingAgent(R2RAgent):
 
                             # (b) Find new citation spans in the accumulated text
                             new_citation_spans = find_new_citation_spans(
-                                partial_text_buffer, citation_tracker
+                                partial_text_buffer,
+                                citation_tracker,
+                                start=citation_scan_offset,
+                            )
+                            citation_scan_offset = next_citation_scan_offset(
+                                partial_text_buffer
                             )
 
                             # Process each new citation span
@@ -558,20 +627,12 @@ class R2RStreamingAgent(R2RAgent):
                             )
 
                             # (c) Execute each tool call in parallel
-                            await asyncio.gather(
-                                *[
-                                    self.handle_function_or_tool_call(
-                                        c["name"],
-                                        c["arguments"],
-                                        tool_id=c["tool_call_id"],
-                                    )
-                                    for c in calls_list
-                                ]
-                            )
+                            await self._execute_tool_calls(calls_list)
 
                             # Reset buffer & calls
                             pending_tool_calls.clear()
                             partial_text_buffer = ""
+                            citation_scan_offset = 0
 
                         elif finish_reason == "stop":
                             # Handle thinking if present
@@ -863,6 +924,7 @@ class R2RXMLStreamingAgent(R2RStreamingAgent):
 
                     # Create state variables for each iteration
                     iteration_buffer = ""
+                    citation_scan_offset = 0
                     yielded_first_event = False
                     in_action_block = False
                     is_thinking = False
@@ -958,7 +1020,12 @@ class R2RXMLStreamingAgent(R2RStreamingAgent):
 
                             # (b) Find new citation spans in the accumulated text
                             new_citation_spans = find_new_citation_spans(
-                                iteration_buffer, citation_tracker
+                                iteration_buffer,
+                                citation_tracker,
+                                start=citation_scan_offset,
+                            )
+                            citation_scan_offset = next_citation_scan_offset(
+                                iteration_buffer
                             )
 
                             # Process each new citation span
@@ -1075,8 +1142,8 @@ class R2RXMLStreamingAgent(R2RStreamingAgent):
                     )
 
                     if len(action_matches) > 0:
-                        # Process each ToolCall
-                        xml_toolcalls = "<ToolCalls>"
+                        # Collect each ToolCall
+                        calls_list = []
 
                         for action_block in action_matches:
                             tool_calls_text = []
@@ -1099,57 +1166,68 @@ class R2RXMLStreamingAgent(R2RStreamingAgent):
                                         self._parse_single_tool_call(tc_block)
                                     )
                                     if tool_name:
-                                        # Emit SSE event for tool call
-                                        tool_call_id = (
-                                            f"call_{abs(hash(tc_block))}"
-                                        )
-                                        call_evt_data = {
-                                            "tool_call_id": tool_call_id,
-                                            "name": tool_name,
-                                            "arguments": json.dumps(
-                                                tool_params
-                                            ),
-                                        }
-                                        async for line in (
-                                            SSEFormatter.yield_tool_call_event(
-                                                call_evt_data
-                                            )
-                                        ):
-                                            yield line
-
-                                        try:
-                                            tool_result = await self.handle_function_or_tool_call(
-                                                tool_name,
-                                                json.dumps(tool_params),
-                                                tool_id=tool_call_id,
-                                                save_messages=False,
-                                            )
-                                            result_content = tool_result.llm_formatted_result
-                                        except Exception as e:
-                                            result_content = f"Error in tool '{tool_name}': {str(e)}"
-
-                                        xml_toolcalls += (
-                                            f"<ToolCall>"
-                                            f"<Name>{tool_name}</Name>"
-                                            f"<Parameters>{json.dumps(tool_params)}</Parameters>"
-                                            f"<Result>{result_content}</Result>"
-                                            f"</ToolCall>"
+                                        calls_list.append(
+                                            {
+                                                "tool_call_id": f"call_{abs(hash(tc_block))}",
+                                                "name": tool_name,
+                                                "arguments": json.dumps(
+                                                    tool_params
+                                                ),
+                                            }
                                         )
 
-                                        # Emit SSE tool result for non-result tools
-                                        result_data = {
-                                            "tool_call_id": tool_call_id,
-                                            "role": "tool",
-                                            "content": json.dumps(
-                                                convert_nonserializable_objects(
-                                                    result_content
-                                                )
-                                            ),
-                                        }
-                                        async for line in SSEFormatter.yield_tool_result_event(
-                                            result_data
-                                        ):
-                                            yield line
+                        # Emit SSE events for the tool calls
+                        for c in calls_list:
+                            async for (
+                                line
+                            ) in SSEFormatter.yield_tool_call_event(
+                                self._create_tool_call_data(c)
+                            ):
+                                yield line
+
+                        # Execute the tool calls together
+                        tool_results = await self._execute_tool_calls(
+                            calls_list,
+                            save_messages=False,
+                            return_exceptions=True,
+                        )
+
+                        # Process each ToolCall result
+                        xml_toolcalls = "<ToolCalls>"
+                        for c, tool_result in zip(
+                            calls_list, tool_results, strict=True
+                        ):
+                            if isinstance(tool_result, BaseException):
+                                result_content = f"Error in tool '{c['name']}': {str(tool_result)}"
+                            else:
+                                result_content = (
+                                    tool_result.llm_formatted_result
+                                )
+
+                            xml_toolcalls += (
+                                f"<ToolCall>"
+                                f"<Name>{c['name']}</Name>"
+                                f"<Parameters>{c['arguments']}</Parameters>"
+                                f"<Result>{result_content}</Result>"
+                                f"</ToolCall>"
+                            )
+
+                            # Emit SSE tool result for non-result tools
+                            result_data = {
+                                "tool_call_id": c["tool_call_id"],
+                                "role": "tool",
+                                "content": json.dumps(
+                                    convert_nonserializable_objects(
+                                        result_content
+                                    )
+                                ),
+                            }
+                            async for (
+                                line
+                            ) in SSEFormatter.yield_tool_result_event(
+                                result_data
+                            ):
+                                yield line
 
                         xml_toolcalls += "</ToolCalls>"
                         pre_action_text = iteration_buffer[
@@ -1372,7 +1450,7 @@ class R2RXMLToolsAgent(R2RAgent):
         # Process any tool calls in the content
         action_matches = self.ACTION_PATTERN.findall(content)
         if action_matches:
-            xml_toolcalls = "<ToolCalls>"
+            calls_list = []
             for action_block in action_matches:
                 tool_calls_text = []
                 # Look for ToolCalls wrapper, or use the raw action block
@@ -1383,7 +1461,7 @@ class R2RXMLToolsAgent(R2RAgent):
                 else:
                     tool_calls_text.append(action_block)
 
-                # Process each ToolCall
+                # Collect each ToolCall
                 for calls_region in tool_calls_text:
                     calls_found = self.TOOLCALL_PATTERN.findall(calls_region)
                     for tc_block in calls_found:
@@ -1391,36 +1469,40 @@ class R2RXMLToolsAgent(R2RAgent):
                             tc_block
                         )
                         if tool_name:
-                            tool_call_id = f"call_{abs(hash(tc_block))}"
-                            try:
-                                tool_result = (
-                                    await self.handle_function_or_tool_call(
-                                        tool_name,
-                                        json.dumps(tool_params),
-                                        tool_id=tool_call_id,
-                                        save_messages=False,
-                                    )
-                                )
+                            calls_list.append(
+                                {
+                                    "tool_call_id": f"call_{abs(hash(tc_block))}",
+                                    "name": tool_name,
+                                    "arguments": json.dumps(tool_params),
+                                }
+                            )
 
-                                # Add tool result to XML
-                                xml_toolcalls += (
-                                    f"<ToolCall>"
-                                    f"<Name>{tool_name}</Name>"
-                                    f"<Parameters>{json.dumps(tool_params)}</Parameters>"
-                                    f"<Result>{tool_result.llm_formatted_result}</Result>"
-                                    f"</ToolCall>"
-                                )
+            # Execute the tool calls together
+            tool_results = await self._execute_tool_calls(
+                calls_list, save_messages=False, return_exceptions=True
+            )
 
-                            except Exception as e:
-                                logger.error(f"Error in tool call: {str(e)}")
-                                # Add error to XML
-                                xml_toolcalls += (
-                                    f"<ToolCall>"
-                                    f"<Name>{tool_name}</Name>"
-                                    f"<Parameters>{json.dumps(tool_params)}</Parameters>"
-                                    f"<Result>Error: {str(e)}</Result>"
-                                    f"</ToolCall>"
-                                )
+            xml_toolcalls = "<ToolCalls>"
+            for c, tool_result in zip(calls_list, tool_results, strict=True):
+                if isinstance(tool_result, BaseException):
+                    logger.error(f"Error in tool call: {str(tool_result)}")
+                    # Add error to XML
+                    xml_toolcalls += (
+                        f"<ToolCall>"
+                        f"<Name>{c['name']}</Name>"
+                        f"<Parameters>{c['arguments']}</Parameters>"
+                        f"<Result>Error: {str(tool_result)}</Result>"
+                        f"</ToolCall>"
+                    )
+                else:
+                    # Add tool result to XML
+                    xml_toolcalls += (
+                        f"<ToolCall>"
+                        f"<Name>{c['name']}</Name>"
+                        f"<Parameters>{c['arguments']}</Parameters>"
+                        f"<Result>{tool_result.llm_formatted_result}</Result>"
+                        f"</ToolCall>"
+                    )
 
             xml_toolcalls += "</ToolCalls>"
             pre_action_text = content[: content.find(action_block)]
@@ -1,8 +1,17 @@
 # type: ignore
+import asyncio
+import functools
+import json
 import logging
-from typing import Any, Callable, Optional
+import os
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional
 from uuid import UUID
 
+import httpx
+
 from core.base import (
     format_search_results_for_llm,
 )
@@ -22,10 +31,10 @@ from core.providers import (
     R2RCompletionProvider,
 )
 from core.utils import (
-    SearchResultsCollector,
     generate_id,
-    num_tokens,
+    truncate_to_tokens,
 )
+from core.utils.serper import SerperClient
 
 from ..base.agent.agent import RAGAgentConfig
 
@@ -39,6 +48,220 @@ from .base import (
 
 logger = logging.getLogger(__name__)
 
+try:
+    from tavily import TavilyClient
+except ImportError:
+    TavilyClient = None
+
+# Tool parameter schemas are constant, so build them once at import time
+_SEARCH_FILE_KNOWLEDGE_TOOL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "query": {
+            "type": "string",
+            "description": "User query to search in the local DB.",
+        },
+    },
+    "required": ["query"],
+}
+
+# Most searches a single search_file_knowledge_batch call may run at once
+_MAX_BATCH_QUERIES = 10
+
+_SEARCH_FILE_KNOWLEDGE_BATCH_TOOL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "queries": {
+            "type": "array",
+            "items": {"type": "string"},
+            "maxItems": _MAX_BATCH_QUERIES,
+            "description": "User queries to search in the local DB, one search per query.",
+        },
+    },
+    "required": ["queries"],
+}
+
+_GET_FILE_CONTENT_TOOL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "document_id": {
+            "type": "string",
+            "description": "The unique UUID of the document to fetch.",
+        },
+    },
+    "required": ["document_id"],
+}
+
+_WEB_SEARCH_TOOL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "query": {
+            "type": "string",
+            "description": "The query to search with an external web API.",
+        },
+    },
+    "required": ["query"],
+}
+
+_TAVILY_SEARCH_TOOL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "query": {
+            "type": "string",
+            "description": "The query to search using Tavily that should be no more than 400 characters.",
+        },
+        "kwargs": {
+            "type": "object",
+            "description": (
+                "Dictionary for additional parameters to pass to Tavily, such as max_results, include_domains and exclude_domains."
+                '{"max_results": 10, "include_domains": ["example.com"], "exclude_domains": ["example2.com"]}'
+            ),
+        },
+    },
+    "required": ["query"],
+}
+
+_SEARCH_FILE_DESCRIPTIONS_TOOL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "query": {
+            "type": "string",
+            "description": "Query string to semantic search over available files 'list documents about XYZ'.",
+        }
+    },
+    "required": ["query"],
+}
+
+_WEB_SCRAPE_TOOL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "url": {
+            "type": "string",
+            "description": (
+                "The absolute URL of the webpage you want to scrape. "
+                "Example: 'https://docs.firecrawl.dev/getting-started'"
+            ),
+        }
+    },
+    "required": ["url"],
+}
+
+_TAVILY_EXTRACT_TOOL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "url": {
+            "type": "string",
+            "description": (
+                "The absolute URL of the webpage you want to extract content from. "
+                "Example: 'https://www.example.com/article'"
+            ),
+        }
+    },
+    "required": ["url"],
+}
+
+# Web tools share one pooled client per event loop. Keep-alive connections
+# are bound to the loop that opened them, so clients are never shared
+# across loops.
+_HTTP_CLIENTS: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, httpx.AsyncClient
+] = weakref.WeakKeyDictionary()
+
+_FIRECRAWL_API_URL = "https://api.firecrawl.dev"
+
+# Blocking SDK calls run on this pool, which caps how many run at once.
+# Unlike an asyncio primitive it is not bound to a single event loop.
+_IO_EXECUTOR = ThreadPoolExecutor(
+    max_workers=32, thread_name_prefix="r2r-agent-io"
+)
+
+# Scraped page content beyond this many characters is truncated
+_MAX_PAGE_CONTENT_LENGTH = 100_000
+_PAGE_CONTENT_TRUNCATED = "...FURTHER CONTENT TRUNCATED..."
+
+# Number of tool results each agent keeps for repeated identical calls
+_TOOL_CACHE_SIZE = 128
+
+
+# Number of callers currently awaiting each shared tool call
+_TOOL_WAITERS: weakref.WeakKeyDictionary[asyncio.Future, int] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _dedup_inflight(fn: Callable) -> Callable:
+    """
+    Share a single execution between identical tool calls on one agent.
+
+    Calls are keyed on the function name and its canonicalized arguments.
+    Concurrent callers await the same future, and completed results stay in
+    the agent's bounded LRU so a repeated call in a later turn is answered
+    without another round-trip. Failed calls are evicted so they can be
+    retried. When every caller of an unfinished call is cancelled, the call
+    itself is cancelled and evicted.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(self, *args, **kwargs):
+        key = (
+            fn.__name__,
+            json.dumps([args, kwargs], sort_keys=True, default=str),
+        )
+        cache = self._tool_cache
+        future = cache.get(key)
+        if future is not None:
+            cache.move_to_end(key)
+        else:
+            future = asyncio.ensure_future(fn(self, *args, **kwargs))
+            cache[key] = future
+
+            def _evict_failed(done: asyncio.Future) -> None:
+                failed = done.cancelled() or done.exception() is not None
+                if failed and cache.get(key) is done:
+                    del cache[key]
+
+            future.add_done_callback(_evict_failed)
+            while len(cache) > _TOOL_CACHE_SIZE:
+                cache.popitem(last=False)
+
+        _TOOL_WAITERS[future] = _TOOL_WAITERS.get(future, 0) + 1
+        try:
+            # Shield so that one cancelled caller does not cancel the others
+            return await asyncio.shield(future)
+        finally:
+            remaining = _TOOL_WAITERS.pop(future, 1) - 1
+            if remaining:
+                _TOOL_WAITERS[future] = remaining
+            elif not future.done():
+                # The last caller went away, so stop the work it started
+                future.cancel()
+                if cache.get(key) is future:
+                    del cache[key]
+
+    return wrapper
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the web tools' HTTP client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    client = _HTTP_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=30,
+            limits=httpx.Limits(
+                max_connections=100, max_keepalive_connections=20
+            ),
+        )
+        _HTTP_CLIENTS[loop] = client
+    return client
+
+
+async def aclose_http_client() -> None:
+    """Close the web tools' HTTP client for the running event loop."""
+    client = _HTTP_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
 
 class RAGAgentMixin:
     """
@@ -49,26 +272,46 @@ class RAGAgentMixin:
       - call an external web search API
     """
 
-    def __init__(
+    # Maps each configurable tool name to the method that builds its Tool
+    _TOOL_FACTORIES = {
+        "get_file_content": "content",
+        "web_scrape": "web_scrape",
+        "tavily_extract": "tavily_extract",
+        "search_file_knowledge": "search_file_knowledge",
+        "search_file_knowledge_batch": "search_file_knowledge_batch",
+        "search_file_descriptions": "search_files",
+        "web_search": "web_search",
+        "tavily_search": "tavily_search",
+    }
+
+    def _init_rag(
         self,
-        *args,
+        *,
         search_settings: SearchSettings,
-        knowledge_search_method: Callable,
+        knowledge_search_method: Callable[
+            ..., Awaitable[AggregateSearchResult]
+        ],
         content_method: Callable,
         file_search_method: Callable,
         max_tool_context_length=10_000,
         max_context_window_tokens=512_000,
-        **kwargs,
     ):
+        """
+        Set up the retrieval state. Called once by each RAG agent after its
+        base agent's __init__, which has already registered the tools and
+        created the search results collector.
+        """
         # Save references to the retrieval logic
         self.search_settings = search_settings
+        self._has_global_filters = bool(search_settings.filters)
         self.knowledge_search_method = knowledge_search_method
         self.content_method = content_method
         self.file_search_method = file_search_method
         self.max_tool_context_length = max_tool_context_length
         self.max_context_window_tokens = max_context_window_tokens
-        self.search_results_collector = SearchResultsCollector()
-        super().__init__(*args, **kwargs)
+        self._tool_cache: OrderedDict[tuple, asyncio.Future] = OrderedDict()
+        self._serper_client: Optional[SerperClient] = None
+        self._tavily_client: Optional[TavilyClient] = None
 
     def _register_tools(self):
         """
@@ -78,22 +321,10 @@ class RAGAgentMixin:
             return
 
         for tool_name in set(self.config.rag_tools):
-            if tool_name == "get_file_content":
-                self._tools.append(self.content())
-            elif tool_name == "web_scrape":
-                self._tools.append(self.web_scrape())
-            elif tool_name == "tavily_extract":
-                self._tools.append(self.tavily_extract())
-            elif tool_name == "search_file_knowledge":
-                self._tools.append(self.search_file_knowledge())
-            elif tool_name == "search_file_descriptions":
-                self._tools.append(self.search_files())
-            elif tool_name == "web_search":
-                self._tools.append(self.web_search())
-            elif tool_name == "tavily_search":
-                self._tools.append(self.tavily_search())
-            else:
+            factory = self._TOOL_FACTORIES.get(tool_name)
+            if factory is None:
                 raise ValueError(f"Unknown tool requested: {tool_name}")
+            self._tools.append(getattr(self, factory)())
         logger.debug(f"Registered {len(self._tools)} RAG tools.")
 
     # Local Search Tool
@@ -110,18 +341,10 @@ class RAGAgentMixin:
             ),
             results_function=self._file_knowledge_search_function,
             llm_format_function=self.format_search_results_for_llm,
-            parameters={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "User query to search in the local DB.",
-                    },
-                },
-                "required": ["query"],
-            },
+            parameters=_SEARCH_FILE_KNOWLEDGE_TOOL_SCHEMA,
         )
 
+    @_dedup_inflight
     async def _file_knowledge_search_function(
         self,
         query: str,
@@ -129,8 +352,8 @@ class RAGAgentMixin:
         **kwargs,
     ) -> AggregateSearchResult:
         """
-        Calls the passed-in `knowledge_search_method(query, search_settings)`.
-        Expects either an AggregateSearchResult or a dict with chunk_search_results, etc.
+        Calls the passed-in `knowledge_search_method(query, search_settings)`,
+        which returns an AggregateSearchResult.
         """
         if not self.knowledge_search_method:
             raise ValueError(
@@ -140,11 +363,24 @@ class RAGAgentMixin:
         raw_response = await self.knowledge_search_method(
             query=query, search_settings=self.search_settings
         )
+        agg = self._as_aggregate_search_result(raw_response)
 
-        if isinstance(raw_response, AggregateSearchResult):
-            agg = raw_response
-        else:
-            agg = AggregateSearchResult(
+        # 1) Store them so that we can do final citations later
+        self.search_results_collector.add_aggregate_result(agg)
+        return agg
+
+    def _as_aggregate_search_result(
+        self, raw_response
+    ) -> AggregateSearchResult:
+        """
+        Normalize a knowledge_search_method response. Plain dicts with
+        chunk_search_results, etc. are only accepted when the agent config
+        enables `legacy_dict_responses`.
+        """
+        if self.config.legacy_dict_responses and isinstance(
+            raw_response, dict
+        ):
+            return AggregateSearchResult(
                 chunk_search_results=raw_response.get(
                     "chunk_search_results", []
                 ),
@@ -152,8 +388,78 @@ class RAGAgentMixin:
                     "graph_search_results", []
                 ),
             )
+        return raw_response
 
-        # 1) Store them so that we can do final citations later
+    def search_file_knowledge_batch(self) -> Tool:
+        """
+        Tool to run several semantic/hybrid searches on the local knowledge
+        base in one call, for when the agent plans multiple lookups at once.
+        """
+        return Tool(
+            name="search_file_knowledge_batch",
+            description=(
+                "Search your local knowledge base for several queries at once. "
+                "Use this instead of repeated search_file_knowledge calls when you already know all the queries you want to run."
+            ),
+            results_function=self._file_knowledge_search_batch,
+            llm_format_function=self.format_search_results_for_llm,
+            parameters=_SEARCH_FILE_KNOWLEDGE_BATCH_TOOL_SCHEMA,
+        )
+
+    @_dedup_inflight
+    async def _file_knowledge_search_batch(
+        self,
+        queries: list[str],
+        *args,
+        **kwargs,
+    ) -> AggregateSearchResult:
+        """
+        Runs `knowledge_search_method` for every query concurrently and merges
+        the results, dropping chunks already returned for an earlier query.
+        The searches are run with `batch_concurrent` so that the retrieval
+        service embeds the queries in a single request.
+        """
+        if not self.knowledge_search_method:
+            raise ValueError(
+                "No knowledge_search_method provided to RAGAgentMixin."
+            )
+
+        # Models sometimes send a single query as a bare string
+        if isinstance(queries, str):
+            queries = [queries]
+        unique_queries = list(dict.fromkeys(queries))
+        if len(unique_queries) > _MAX_BATCH_QUERIES:
+            raise ValueError(
+                f"search_file_knowledge_batch accepts at most {_MAX_BATCH_QUERIES} queries, got {len(unique_queries)}."
+            )
+
+        search_settings = self.search_settings.model_copy(
+            update={"batch_concurrent": True}
+        )
+        raw_responses = await asyncio.gather(
+            *(
+                self.knowledge_search_method(
+                    query=query, search_settings=search_settings
+                )
+                for query in unique_queries
+            )
+        )
+
+        chunk_search_results = []
+        graph_search_results = []
+        seen_chunk_ids = set()
+        for raw_response in raw_responses:
+            response = self._as_aggregate_search_result(raw_response)
+            for chunk in response.chunk_search_results or []:
+                if chunk.id not in seen_chunk_ids:
+                    seen_chunk_ids.add(chunk.id)
+                    chunk_search_results.append(chunk)
+            graph_search_results.extend(response.graph_search_results or [])
+
+        agg = AggregateSearchResult(
+            chunk_search_results=chunk_search_results,
+            graph_search_results=graph_search_results,
+        )
         self.search_results_collector.add_aggregate_result(agg)
         return agg
 
@@ -174,18 +480,10 @@ class RAGAgentMixin:
             ),
             results_function=self._content_function,
             llm_format_function=self.format_search_results_for_llm,
-            parameters={
-                "type": "object",
-                "properties": {
-                    "document_id": {
-                        "type": "string",
-                        "description": "The unique UUID of the document to fetch.",
-                    },
-                },
-                "required": ["document_id"],
-            },
+            parameters=_GET_FILE_CONTENT_TOOL_SCHEMA,
         )
 
+    @_dedup_inflight
     async def _content_function(
         self,
         document_id: str,
@@ -216,6 +514,10 @@ class RAGAgentMixin:
             # Return empty result or raise specific error
             return AggregateSearchResult(document_search_results=[])
 
+        # Scope the lookup by the caller's filters without mutating them
+        if self._has_global_filters:
+            filters = {"$and": [filters, self.search_settings.filters]}
+
         options = options or {}
 
         # Actually call your data retrieval
@@ -242,18 +544,10 @@ class RAGAgentMixin:
             ),
             results_function=self._web_search_function,
             llm_format_function=self.format_search_results_for_llm,
-            parameters={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "The query to search with an external web API.",
-                    },
-                },
-                "required": ["query"],
-            },
+            parameters=_WEB_SEARCH_TOOL_SCHEMA,
         )
 
+    @_dedup_inflight
     async def _web_search_function(
         self,
         query: str,
@@ -264,22 +558,14 @@ class RAGAgentMixin:
         Calls an external search engine (Serper, Google, etc.) asynchronously
         and returns results in an AggregateSearchResult.
         """
-        import asyncio
-
-        from ..utils.serper import SerperClient  # adjust your import
-
-        serper_client = SerperClient()
+        if self._serper_client is None:
+            self._serper_client = SerperClient()
 
-        # If SerperClient.get_raw is not already async, wrap it in run_in_executor
-        raw_results = await asyncio.get_event_loop().run_in_executor(
-            None,  # Uses the default executor
-            lambda: serper_client.get_raw(query),
+        raw_results = await self._serper_client.aget_raw(
+            query, client=_get_http_client()
         )
 
-        # If from_serper_results is not already async, wrap it in run_in_executor too
-        web_response = await asyncio.get_event_loop().run_in_executor(
-            None, lambda: WebSearchResult.from_serper_results(raw_results)
-        )
+        web_response = WebSearchResult.from_serper_results(raw_results)
 
         agg = AggregateSearchResult(
             chunk_search_results=None,
@@ -301,25 +587,31 @@ class RAGAgentMixin:
             ),
             results_function=self._tavily_search_function,
             llm_format_function=self.format_search_results_for_llm,
-            parameters={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "The query to search using Tavily that should be no more than 400 characters.",
-                    },
-                    "kwargs": {
-                        "type": "object",
-                        "description": (
-                            "Dictionary for additional parameters to pass to Tavily, such as max_results, include_domains and exclude_domains."
-                            '{"max_results": 10, "include_domains": ["example.com"], "exclude_domains": ["example2.com"]}'
-                        ),
-                    },
-                },
-                "required": ["query"],
-            },
+            parameters=_TAVILY_SEARCH_TOOL_SCHEMA,
         )
 
+    def _get_tavily_client(self) -> Optional[TavilyClient]:
+        """Return this agent's Tavily client, or None if it can't be used."""
+        if self._tavily_client is not None:
+            return self._tavily_client
+
+        # Check if Tavily is installed
+        if TavilyClient is None:
+            logger.error(
+                "The 'tavily-python' package is not installed. Please install it with 'pip install tavily-python'"
+            )
+            return None
+
+        # Get API key from environment variables
+        api_key = os.environ.get("TAVILY_API_KEY")
+        if not api_key:
+            logger.warning("TAVILY_API_KEY environment variable not set")
+            return None
+
+        self._tavily_client = TavilyClient(api_key=api_key)
+        return self._tavily_client
+
+    @_dedup_inflight
     async def _tavily_search_function(
         self,
         query: str,
@@ -332,9 +624,6 @@ class RAGAgentMixin:
         Note: For efficient processing, keep queries concise (under 400 characters).
         Think of them as search engine queries, not long-form prompts.
         """
-        import asyncio
-        import os
-
         # Check if query is too long (Tavily recommends under 400 chars)
         if len(query) > 400:
             logger.warning(
@@ -343,30 +632,16 @@ class RAGAgentMixin:
             # Truncate the query to improve performance
             query = query[:400]
 
-        # Check if Tavily is installed
-        try:
-            from tavily import TavilyClient
-        except ImportError:
-            logger.error(
-                "The 'tavily-python' package is not installed. Please install it with 'pip install tavily-python'"
-            )
-            # Return empty results in case Tavily is not installed
+        tavily_client = self._get_tavily_client()
+        if tavily_client is None:
             return AggregateSearchResult(web_search_results=[])
 
-        # Get API key from environment variables
-        api_key = os.environ.get("TAVILY_API_KEY")
-        if not api_key:
-            logger.warning("TAVILY_API_KEY environment variable not set")
-            return AggregateSearchResult(web_search_results=[])
-
-        # Initialize Tavily client
-        tavily_client = TavilyClient(api_key=api_key)
-
         try:
-            # Perform the search asynchronously
-            raw_results = await asyncio.get_event_loop().run_in_executor(
-                None,  # Uses the default executor
-                lambda: tavily_client.search(
+            # The Tavily SDK is blocking, so run it off the event loop
+            raw_results = await asyncio.get_running_loop().run_in_executor(
+                _IO_EXECUTOR,
+                functools.partial(
+                    tavily_client.search,
                     query=query,
                     search_depth="advanced",
                     include_raw_content=False,
@@ -416,18 +691,10 @@ class RAGAgentMixin:
             ),
             results_function=self._search_files_function,
             llm_format_function=self.format_search_results_for_llm,
-            parameters={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "Query string to semantic search over available files 'list documents about XYZ'.",
-                    }
-                },
-                "required": ["query"],
-            },
+            parameters=_SEARCH_FILE_DESCRIPTIONS_TOOL_SCHEMA,
         )
 
+    @_dedup_inflight
     async def _search_files_function(
         self, query: str, *args, **kwargs
     ) -> AggregateSearchResult:
@@ -460,13 +727,7 @@ class RAGAgentMixin:
         context = format_search_results_for_llm(
             results, self.search_results_collector
         )
-        context_tokens = num_tokens(context) + 1
-        frac_to_return = self.max_tool_context_length / (context_tokens)
-
-        if frac_to_return > 1:
-            return context
-        else:
-            return context[: int(frac_to_return * len(context))]
+        return truncate_to_tokens(context, self.max_tool_context_length)
 
     def web_scrape(self) -> Tool:
         """
@@ -482,21 +743,10 @@ class RAGAgentMixin:
             ),
             results_function=self._web_scrape_function,
             llm_format_function=self.format_search_results_for_llm,
-            parameters={
-                "type": "object",
-                "properties": {
-                    "url": {
-                        "type": "string",
-                        "description": (
-                            "The absolute URL of the webpage you want to scrape. "
-                            "Example: 'https://docs.firecrawl.dev/getting-started'"
-                        ),
-                    }
-                },
-                "required": ["url"],
-            },
+            parameters=_WEB_SCRAPE_TOOL_SCHEMA,
         )
 
+    @_dedup_inflight
     async def _web_scrape_function(
         self,
         url: str,
@@ -507,30 +757,35 @@ class RAGAgentMixin:
         Performs the Firecrawl scrape asynchronously, returning results
         as an `AggregateSearchResult` with a single WebPageSearchResult.
         """
-        import asyncio
-
-        from firecrawl import FirecrawlApp
-
-        app = FirecrawlApp()
+        api_url = os.environ.get("FIRECRAWL_API_URL", _FIRECRAWL_API_URL)
+        api_key = os.environ.get("FIRECRAWL_API_KEY")
+        # Self-hosted Firecrawl instances may run without an API key
+        if not api_key and api_url == _FIRECRAWL_API_URL:
+            raise ValueError(
+                "Please set the `FIRECRAWL_API_KEY` environment variable to use `web_scrape`."
+            )
+        headers = {"Content-Type": "application/json"}
+        if api_key:
+            headers["Authorization"] = f"Bearer {api_key}"
         logger.debug(f"[Firecrawl] Scraping URL={url}")
 
-        # Create a proper async wrapper for the synchronous scrape_url method
-        # This offloads the blocking operation to a thread pool
-        response = await asyncio.get_event_loop().run_in_executor(
-            None,  # Uses the default executor
-            lambda: app.scrape_url(
-                url=url,
-                params={"formats": ["markdown"]},
-            ),
+        # Call the Firecrawl REST API directly on the shared async client
+        http_response = await _get_http_client().post(
+            f"{api_url.rstrip('/')}/v1/scrape",
+            json={"url": url, "formats": ["markdown"]},
+            headers=headers,
         )
+        http_response.raise_for_status()
+        response = http_response.json().get("data", {})
 
         markdown_text = response.get("markdown", "")
         metadata = response.get("metadata", {})
         page_title = metadata.get("title", "Untitled page")
 
-        if len(markdown_text) > 100_000:
+        if len(markdown_text) > _MAX_PAGE_CONTENT_LENGTH:
             markdown_text = (
-                markdown_text[:100_000] + "...FURTHER CONTENT TRUNCATED..."
+                markdown_text[:_MAX_PAGE_CONTENT_LENGTH]
+                + _PAGE_CONTENT_TRUNCATED
             )
 
         # Create a single WebPageSearchResult HACK - TODO FIX
@@ -539,7 +794,7 @@ class RAGAgentMixin:
             link=url,
             snippet=markdown_text,
             position=0,
-            id=generate_id(markdown_text),
+            id=generate_id(url),
             type="firecrawl",
         )
 
@@ -565,21 +820,10 @@ class RAGAgentMixin:
             ),
             results_function=self._tavily_extract_function,
             llm_format_function=self.format_search_results_for_llm,
-            parameters={
-                "type": "object",
-                "properties": {
-                    "url": {
-                        "type": "string",
-                        "description": (
-                            "The absolute URL of the webpage you want to extract content from. "
-                            "Example: 'https://www.example.com/article'"
-                        ),
-                    }
-                },
-                "required": ["url"],
-            },
+            parameters=_TAVILY_EXTRACT_TOOL_SCHEMA,
         )
 
+    @_dedup_inflight
     async def _tavily_extract_function(
         self,
         url: str,
@@ -590,41 +834,28 @@ class RAGAgentMixin:
         Calls Tavily's extract API asynchronously to retrieve the content from a specific URL
         and returns results in an AggregateSearchResult.
         """
-        import asyncio
-        import os
-
-        # Check if Tavily is installed
-        try:
-            from tavily import TavilyClient
-        except ImportError:
-            logger.error(
-                "The 'tavily-python' package is not installed. Please install it with 'pip install tavily-python'"
-            )
-            # Return empty results in case Tavily is not installed
-            return AggregateSearchResult(web_search_results=[])
-
-        # Get API key from environment variables
-        api_key = os.environ.get("TAVILY_API_KEY")
-        if not api_key:
-            logger.warning("TAVILY_API_KEY environment variable not set")
+        tavily_client = self._get_tavily_client()
+        if tavily_client is None:
             return AggregateSearchResult(web_search_results=[])
 
-        # Initialize Tavily client
-        tavily_client = TavilyClient(api_key=api_key)
-
         try:
-            # Perform the URL extraction asynchronously
-            extracted_content = await asyncio.get_event_loop().run_in_executor(
-                None,  # Uses the default executor
-                lambda: tavily_client.extract(url, extract_depth="advanced"),
+            # The Tavily SDK is blocking, so run it off the event loop
+            extracted_content = (
+                await asyncio.get_running_loop().run_in_executor(
+                    _IO_EXECUTOR,
+                    functools.partial(
+                        tavily_client.extract, url, extract_depth="advanced"
+                    ),
+                )
             )
 
             web_search_results = []
             for successfulResult in extracted_content.results:
                 content = successfulResult.raw_content
-                if len(content) > 100_000:
+                if len(content) > _MAX_PAGE_CONTENT_LENGTH:
                     content = (
-                        content[:100_000] + "...FURTHER CONTENT TRUNCATED..."
+                        content[:_MAX_PAGE_CONTENT_LENGTH]
+                        + _PAGE_CONTENT_TRUNCATED
                     )
 
                 web_result = WebPageSearchResult(
@@ -665,7 +896,9 @@ class R2RRAGAgent(RAGAgentMixin, R2RAgent):
         config: RAGAgentConfig,
         search_settings: SearchSettings,
         rag_generation_config: GenerationConfig,
-        knowledge_search_method: Callable,
+        knowledge_search_method: Callable[
+            ..., Awaitable[AggregateSearchResult]
+        ],
         content_method: Callable,
         file_search_method: Callable,
         max_tool_context_length: int = 20_000,
@@ -679,13 +912,8 @@ class R2RRAGAgent(RAGAgentMixin, R2RAgent):
             rag_generation_config=rag_generation_config,
         )
         # Initialize the RAGAgentMixin
-        RAGAgentMixin.__init__(
-            self,
-            database_provider=database_provider,
-            llm_provider=llm_provider,
-            config=config,
+        self._init_rag(
             search_settings=search_settings,
-            rag_generation_config=rag_generation_config,
             max_tool_context_length=max_tool_context_length,
             knowledge_search_method=knowledge_search_method,
             file_search_method=file_search_method,
@@ -710,7 +938,9 @@ class R2RXMLToolsRAGAgent(RAGAgentMixin, R2RXMLToolsAgent):
         config: RAGAgentConfig,
         search_settings: SearchSettings,
         rag_generation_config: GenerationConfig,
-        knowledge_search_method: Callable,
+        knowledge_search_method: Callable[
+            ..., Awaitable[AggregateSearchResult]
+        ],
         content_method: Callable,
         file_search_method: Callable,
         max_tool_context_length: int = 20_000,
@@ -724,13 +954,8 @@ class R2RXMLToolsRAGAgent(RAGAgentMixin, R2RXMLToolsAgent):
             rag_generation_config=rag_generation_config,
         )
         # Initialize the RAGAgentMixin
-        RAGAgentMixin.__init__(
-            self,
-            database_provider=database_provider,
-            llm_provider=llm_provider,
-            config=config,
+        self._init_rag(
             search_settings=search_settings,
-            rag_generation_config=rag_generation_config,
             max_tool_context_length=max_tool_context_length,
             knowledge_search_method=knowledge_search_method,
             file_search_method=file_search_method,
@@ -756,7 +981,9 @@ class R2RStreamingRAGAgent(RAGAgentMixin, R2RStreamingAgent):
         config: RAGAgentConfig,
         search_settings: SearchSettings,
         rag_generation_config: GenerationConfig,
-        knowledge_search_method: Callable,
+        knowledge_search_method: Callable[
+            ..., Awaitable[AggregateSearchResult]
+        ],
         content_method: Callable,
         file_search_method: Callable,
         max_tool_context_length: int = 10_000,
@@ -774,13 +1001,8 @@ class R2RStreamingRAGAgent(RAGAgentMixin, R2RStreamingAgent):
         )
 
         # Initialize the RAGAgentMixin
-        RAGAgentMixin.__init__(
-            self,
-            database_provider=database_provider,
-            llm_provider=llm_provider,
-            config=config,
+        self._init_rag(
             search_settings=search_settings,
-            rag_generation_config=rag_generation_config,
             max_tool_context_length=max_tool_context_length,
             knowledge_search_method=knowledge_search_method,
             content_method=content_method,
@@ -812,7 +1034,9 @@ class R2RXMLToolsStreamingRAGAgent(RAGAgentMixin, R2RXMLStreamingAgent):
         config: RAGAgentConfig,
         search_settings: SearchSettings,
         rag_generation_config: GenerationConfig,
-        knowledge_search_method: Callable,
+        knowledge_search_method: Callable[
+            ..., Awaitable[AggregateSearchResult]
+        ],
         content_method: Callable,
         file_search_method: Callable,
         max_tool_context_length: int = 10_000,
@@ -830,13 +1054,8 @@ class R2RXMLToolsStreamingRAGAgent(RAGAgentMixin, R2RXMLStreamingAgent):
         )
 
         # Initialize the RAGAgentMixin
-        RAGAgentMixin.__init__(
-            self,
-            database_provider=database_provider,
-            llm_provider=llm_provider,
-            config=config,
+        self._init_rag(
             search_settings=search_settings,
-            rag_generation_config=rag_generation_config,
             max_tool_context_length=max_tool_context_length,
             knowledge_search_method=knowledge_search_method,
             content_method=content_method,
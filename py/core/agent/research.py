@@ -4,10 +4,15 @@ import subprocess
 import sys
 import tempfile
 from copy import copy
-from typing import Any, Callable, Optional
+from typing import Any, Awaitable, Callable, Optional
 
 from core.base import AppConfig
-from core.base.abstractions import GenerationConfig, Message, SearchSettings
+from core.base.abstractions import (
+    AggregateSearchResult,
+    GenerationConfig,
+    Message,
+    SearchSettings,
+)
 from core.base.agent import Tool
 from core.base.providers import DatabaseProvider
 from core.providers import (
@@ -43,38 +48,21 @@ class ResearchAgentMixin(RAGAgentMixin):
     - A critique tool for analyzing conversation history
     """
 
-    def __init__(
-        self,
-        *args,
-        app_config: AppConfig,
-        search_settings: SearchSettings,
-        knowledge_search_method: Callable,
-        content_method: Callable,
-        file_search_method: Callable,
-        max_tool_context_length=10_000,
-        **kwargs,
-    ):
+    def _init_research(self, *, app_config: AppConfig):
+        """
+        Set up the research state. Called once by each research agent after
+        its RAG agent's __init__.
+        """
         # Store the app configuration needed for research tools
         self.app_config = app_config
 
-        # Call the parent RAGAgentMixin's __init__ with explicitly passed parameters
-        super().__init__(
-            *args,
-            search_settings=search_settings,
-            knowledge_search_method=knowledge_search_method,
-            content_method=content_method,
-            file_search_method=file_search_method,
-            max_tool_context_length=max_tool_context_length,
-            **kwargs,
-        )
-
         # Register our research-specific tools
         self._register_research_tools()
 
     def _register_research_tools(self):
         """
         Register research-specific tools to the agent.
-        This is called by the mixin's __init__ after the parent class initialization.
+        This is called by _init_research after the parent class initialization.
         """
         # Add our research tools to whatever tools are already registered
         research_tools = []
@@ -495,7 +483,9 @@ class R2RResearchAgent(ResearchAgentMixin, R2RRAGAgent):
         config: RAGAgentConfig,
         search_settings: SearchSettings,
         rag_generation_config: GenerationConfig,
-        knowledge_search_method: Callable,
+        knowledge_search_method: Callable[
+            ..., Awaitable[AggregateSearchResult]
+        ],
         content_method: Callable,
         file_search_method: Callable,
         max_tool_context_length: int = 20_000,
@@ -518,19 +508,7 @@ class R2RResearchAgent(ResearchAgentMixin, R2RRAGAgent):
         )
 
         # Then initialize the ResearchAgentMixin
-        ResearchAgentMixin.__init__(
-            self,
-            app_config=app_config,
-            database_provider=database_provider,
-            llm_provider=llm_provider,
-            config=config,
-            search_settings=search_settings,
-            rag_generation_config=rag_generation_config,
-            max_tool_context_length=max_tool_context_length,
-            knowledge_search_method=knowledge_search_method,
-            file_search_method=file_search_method,
-            content_method=content_method,
-        )
+        self._init_research(app_config=app_config)
 
 
 class R2RStreamingResearchAgent(ResearchAgentMixin, R2RStreamingRAGAgent):
@@ -554,7 +532,9 @@ class R2RStreamingResearchAgent(ResearchAgentMixin, R2RStreamingRAGAgent):
         config: RAGAgentConfig,
         search_settings: SearchSettings,
         rag_generation_config: GenerationConfig,
-        knowledge_search_method: Callable,
+        knowledge_search_method: Callable[
+            ..., Awaitable[AggregateSearchResult]
+        ],
         content_method: Callable,
         file_search_method: Callable,
         max_tool_context_length: int = 10_000,
@@ -578,19 +558,7 @@ class R2RStreamingResearchAgent(ResearchAgentMixin, R2RStreamingRAGAgent):
         )
 
         # Then initialize the ResearchAgentMixin
-        ResearchAgentMixin.__init__(
-            self,
-            app_config=app_config,
-            database_provider=database_provider,
-            llm_provider=llm_provider,
-            config=config,
-            search_settings=search_settings,
-            rag_generation_config=rag_generation_config,
-            max_tool_context_length=max_tool_context_length,
-            knowledge_search_method=knowledge_search_method,
-            content_method=content_method,
-            file_search_method=file_search_method,
-        )
+        self._init_research(app_config=app_config)
 
 
 class R2RXMLToolsResearchAgent(ResearchAgentMixin, R2RXMLToolsRAGAgent):
@@ -614,7 +582,9 @@ class R2RXMLToolsResearchAgent(ResearchAgentMixin, R2RXMLToolsRAGAgent):
         config: RAGAgentConfig,
         search_settings: SearchSettings,
         rag_generation_config: GenerationConfig,
-        knowledge_search_method: Callable,
+        knowledge_search_method: Callable[
+            ..., Awaitable[AggregateSearchResult]
+        ],
         content_method: Callable,
         file_search_method: Callable,
         max_tool_context_length: int = 20_000,
@@ -637,15 +607,7 @@ class R2RXMLToolsResearchAgent(ResearchAgentMixin, R2RXMLToolsRAGAgent):
         )
 
         # Then initialize the ResearchAgentMixin
-        ResearchAgentMixin.__init__(
-            self,
-            app_config=app_config,
-            search_settings=search_settings,
-            knowledge_search_method=knowledge_search_method,
-            content_method=content_method,
-            file_search_method=file_search_method,
-            max_tool_context_length=max_tool_context_length,
-        )
+        self._init_research(app_config=app_config)
 
 
 class R2RXMLToolsStreamingResearchAgent(
@@ -671,7 +633,9 @@ class R2RXMLToolsStreamingResearchAgent(
         config: RAGAgentConfig,
         search_settings: SearchSettings,
         rag_generation_config: GenerationConfig,
-        knowledge_search_method: Callable,
+        knowledge_search_method: Callable[
+            ..., Awaitable[AggregateSearchResult]
+        ],
         content_method: Callable,
         file_search_method: Callable,
         max_tool_context_length: int = 10_000,
@@ -695,12 +659,4 @@ class R2RXMLToolsStreamingResearchAgent(
         )
 
         # Then initialize the ResearchAgentMixin
-        ResearchAgentMixin.__init__(
-            self,
-            app_config=app_config,
-            search_settings=search_settings,
-            knowledge_search_method=knowledge_search_method,
-            content_method=content_method,
-            file_search_method=file_search_method,
-            max_tool_context_length=max_tool_context_length,
-        )
+        self._init_research(app_config=app_config)
@@ -45,6 +45,7 @@ class AgentConfig(BaseModel):
     stream: bool = False
     include_tools: bool = True
     max_iterations: int = 10
+    parallel_tool_calls: bool = True
 
     @classmethod
     def create(cls: Type["AgentConfig"], **kwargs: Any) -> "AgentConfig":
@@ -259,6 +260,9 @@ class RAGAgentConfig(AgentConfig):
     stream: bool = False
     include_tools: bool = True
     max_iterations: int = 10
+    parallel_tool_calls: bool = True
+    # Accept plain dicts from knowledge_search_method (older integrations)
+    legacy_dict_responses: bool = False
     # tools: list[str] = [] # HACK - unused variable.
 
     # Default RAG tools
@@ -372,12 +372,13 @@ class RetrievalRouter(BaseRouterV3):
                         "web_scrape",
                         "search_file_descriptions",
                         "search_file_knowledge",
+                        "search_file_knowledge_batch",
                         "get_file_content",
                     ]
                 ]
             ] = Body(
                 None,
-                description="List of tools to enable for RAG mode. Available tools: search_file_knowledge, get_file_content, web_search, web_scrape, search_file_descriptions",
+                description="List of tools to enable for RAG mode. Available tools: search_file_knowledge, search_file_knowledge_batch, get_file_content, web_search, web_scrape, search_file_descriptions",
             ),
             research_tools: Optional[
                 list[
@@ -457,6 +458,7 @@ class RetrievalRouter(BaseRouterV3):
 
             **RAG Tools:**
             - `search_file_knowledge`: Semantic/hybrid search on your ingested documents
+            - `search_file_knowledge_batch`: Several semantic/hybrid searches in one call, with the queries embedded together
             - `search_file_descriptions`: Search over file-level metadata
             - `content`: Fetch entire documents or chunk structures
             - `web_search`: Query external search APIs for up-to-date information
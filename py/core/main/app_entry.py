@@ -8,6 +8,7 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from core.agent.rag import aclose_http_client
 from core.base import R2RException
 from core.utils.logging_config import configure_logging
 
@@ -44,6 +45,7 @@ async def lifespan(app: FastAPI):
 
     # # Shutdown
     scheduler.shutdown()
+    await aclose_http_client()
 
 
 async def create_r2r_app(
@@ -1,6 +1,9 @@
 import asyncio
+import hashlib
 import json
 import logging
+import time
+from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
 from typing import Any, AsyncGenerator, Literal, Optional
@@ -39,12 +42,14 @@ from core.base import (
 from core.base.api.models import RAGResponse, User
 from core.utils import (
     CitationTracker,
+    QueryCoalescer,
     SearchResultsCollector,
     SSEFormatter,
     dump_collector,
     dump_obj,
     extract_citations,
     find_new_citation_spans,
+    next_citation_scan_offset,
     num_tokens_from_messages,
 )
 from shared.api.models.management.responses import MessageResponse
@@ -55,6 +60,11 @@ from .base import Service
 
 logger = logging.getLogger()
 
+# Recent query embeddings are reused for this many seconds, and at most this
+# many of them are kept
+_QUERY_EMBEDDING_CACHE_TTL = 300
+_QUERY_EMBEDDING_CACHE_SIZE = 2048
+
 
 class AgentFactory:
     """
@@ -250,6 +260,63 @@ class RetrievalService(Service):
             config,
             providers,
         )
+        # Shared by all searches with `batch_concurrent` set, so concurrent
+        # queries are embedded in one provider request
+        self._query_embedding_coalescer = QueryCoalescer(
+            lambda queries: self.providers.completion_embedding.async_get_embeddings(
+                queries
+            )
+        )
+        # Maps a digest of (embedding model, query) to (time, embedding)
+        self._query_embedding_cache: OrderedDict[
+            bytes, tuple[float, tuple[float, ...]]
+        ] = OrderedDict()
+
+    async def _embed_query(
+        self, query: str, search_settings: SearchSettings
+    ) -> list[float]:
+        """
+        Embed a search query. A recent embedding of the same query is reused
+        if `cache_query_embeddings` is set, and the query is batched with
+        concurrent ones if `batch_concurrent` is set.
+        """
+        key = None
+        if search_settings.cache_query_embeddings:
+            embedding_config = self.providers.completion_embedding.config
+            key = hashlib.blake2b(
+                f"{embedding_config.provider}:{embedding_config.base_model}:"
+                f"{embedding_config.base_dimension}\0{query}".encode(
+                    "utf-8", "surrogatepass"
+                ),
+                digest_size=16,
+            ).digest()
+
+            now = time.monotonic()
+            cached = self._query_embedding_cache.pop(key, None)
+            if (
+                cached is not None
+                and now - cached[0] < _QUERY_EMBEDDING_CACHE_TTL
+            ):
+                self._query_embedding_cache[key] = cached
+                # Every caller gets its own list
+                return list(cached[1])
+
+        if search_settings.batch_concurrent:
+            embedding = await self._query_embedding_coalescer.submit(query)
+        else:
+            embedding = (
+                await self.providers.completion_embedding.async_get_embedding(
+                    text=query
+                )
+            )
+
+        if key is not None:
+            self._query_embedding_cache[key] = (now, tuple(embedding))
+            while (
+                len(self._query_embedding_cache) > _QUERY_EMBEDDING_CACHE_SIZE
+            ):
+                self._query_embedding_cache.popitem(last=False)
+        return embedding
 
     async def search(
         self,
@@ -288,11 +355,7 @@ class RetrievalService(Service):
             search_settings.use_semantic_search
             or search_settings.use_hybrid_search
         ):
-            query_vector = (
-                await self.providers.completion_embedding.async_get_embedding(
-                    text=query
-                )
-            )
+            query_vector = await self._embed_query(query, search_settings)
 
         # -- 2) Chunk search
         chunk_results = []
@@ -941,11 +1004,7 @@ class RetrievalService(Service):
         query_embedding: Optional[list[float]] = None,
     ) -> list[DocumentResponse]:
         if query_embedding is None:
-            query_embedding = (
-                await self.providers.completion_embedding.async_get_embedding(
-                    query
-                )
-            )
+            query_embedding = await self._embed_query(query, settings)
         result = (
             await self.providers.database.documents_handler.search_documents(
                 query_text=query,
@@ -1088,6 +1147,7 @@ class RetrievalService(Service):
                     citation_payloads = {}
 
                     partial_text_buffer = ""
+                    citation_scan_offset = 0
 
                     # Begin streaming from the LLM
                     msg_stream = self.providers.llm.aget_completion_stream(
@@ -1127,7 +1187,14 @@ class RetrievalService(Service):
                                 #     For each *new* short ID, emit an SSE "citation" event
                                 # Find new citation spans in the accumulated text
                                 new_citation_spans = find_new_citation_spans(
-                                    partial_text_buffer, citation_tracker
+                                    partial_text_buffer,
+                                    citation_tracker,
+                                    start=citation_scan_offset,
+                                )
+                                citation_scan_offset = (
+                                    next_citation_scan_offset(
+                                        partial_text_buffer
+                                    )
                                 )
 
                                 # Process each new citation span
@@ -1752,7 +1819,8 @@ class RetrievalService(Service):
             return []
 
         # 3. For each document, fetch associated chunks in ascending chunk order
-        results = []
+        results: list[dict[str, Any]] = []
+        append = results.append
         for doc_response in matching_docs["results"]:
             doc_id = doc_response.id
             chunk_data = await self.providers.database.chunks_handler.list_document_chunks(
@@ -1764,7 +1832,7 @@ class RetrievalService(Service):
             chunks = chunk_data["results"]  # already sorted by chunk_order
             doc_response.chunks = chunks
             # 4. Build a returned structure that includes doc + chunks
-            results.append(doc_response.model_dump())
+            append(doc_response.model_dump())
 
         return results
 
@@ -1954,7 +2022,7 @@ class RetrievalService(Service):
             serper_client = SerperClient()
 
             # Perform the raw search using Serper API
-            raw_results = serper_client.get_raw(query)
+            raw_results = await serper_client.aget_raw(query)
 
             # Process the raw results into a WebSearchResult object
             web_response = WebSearchResult.from_serper_results(raw_results)
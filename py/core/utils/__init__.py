@@ -1,5 +1,6 @@
+import asyncio
 import re
-from typing import Set, Tuple
+from typing import Any, Awaitable, Callable, Optional, Set, Tuple
 
 from shared.utils.base_utils import (
     SearchResultsCollector,
@@ -18,6 +19,7 @@ from shared.utils.base_utils import (
     increment_version,
     num_tokens,
     num_tokens_from_messages,
+    truncate_to_tokens,
     update_settings_from_dict,
     validate_uuid,
     yield_sse_event,
@@ -27,6 +29,12 @@ from shared.utils.splitter.text import (
     TextSplitter,
 )
 
+# Citation IDs enclosed in brackets, like [abc1234]
+_CITATION_PATTERN = re.compile(r"\[([A-Za-z0-9]{7,8})\]")
+
+# Length of the longest possible citation: "[" + 8 ID characters + "]"
+_MAX_CITATION_LENGTH = 10
+
 
 def extract_citations(text: str) -> list[str]:
     """
@@ -43,23 +51,23 @@ def extract_citations(text: str) -> list[str]:
     if text is None or text == "":
         return []
 
-    # Direct pattern to match IDs inside brackets with alphanumeric pattern
-    CITATION_PATTERN = re.compile(r"\[([A-Za-z0-9]{7,8})\]")
-
     sids = []
-    for match in CITATION_PATTERN.finditer(text):
+    for match in _CITATION_PATTERN.finditer(text):
         sid = match.group(1)
         sids.append(sid)
 
     return sids
 
 
-def extract_citation_spans(text: str) -> dict[str, list[Tuple[int, int]]]:
+def extract_citation_spans(
+    text: str, start: int = 0
+) -> dict[str, list[Tuple[int, int]]]:
     """
     Extract citation IDs with their positions in the text.
 
     Args:
         text: The text to search for citations. If None, returns an empty dict.
+        start: Position in the text from which to start searching.
 
     Returns:
         Dictionary mapping citation IDs to lists of (start, end) position tuples,
@@ -70,21 +78,18 @@ def extract_citation_spans(text: str) -> dict[str, list[Tuple[int, int]]]:
     if text is None or text == "":
         return {}
 
-    # Use the same pattern as the original extract_citations
-    CITATION_PATTERN = re.compile(r"\[([A-Za-z0-9]{7,8})\]")
-
     citation_spans: dict = {}
 
-    for match in CITATION_PATTERN.finditer(text):
+    for match in _CITATION_PATTERN.finditer(text, start):
         sid = match.group(1)
-        start = match.start()
-        end = match.end()
+        span_start = match.start()
+        span_end = match.end()
 
         if sid not in citation_spans:
             citation_spans[sid] = []
 
         # Add the position span
-        citation_spans[sid].append((start, end))
+        citation_spans[sid].append((span_start, span_end))
 
     return citation_spans
 
@@ -178,7 +183,7 @@ class CitationTracker:
 
 
 def find_new_citation_spans(
-    text: str, tracker: CitationTracker
+    text: str, tracker: CitationTracker, start: int = 0
 ) -> dict[str, list[Tuple[int, int]]]:
     """
     Extract citation spans that haven't been processed yet.
@@ -186,6 +191,9 @@ def find_new_citation_spans(
     Args:
         text: Text to search. If None, returns an empty dict.
         tracker: The CitationTracker instance to check against for new spans
+        start: Position in the text from which to start searching. Streaming
+            callers pass `next_citation_scan_offset` of the previous buffer
+            so that only the newly streamed text is scanned.
 
     Returns:
         Dictionary of citation IDs to lists of new (start, end) spans
@@ -196,7 +204,7 @@ def find_new_citation_spans(
         return {}
 
     # Get all citation spans in the text
-    all_spans = extract_citation_spans(text)
+    all_spans = extract_citation_spans(text, start)
 
     # Filter to only spans we haven't processed yet
     new_spans: dict = {}
@@ -211,6 +219,90 @@ def find_new_citation_spans(
     return new_spans
 
 
+def next_citation_scan_offset(text: str) -> int:
+    """
+    Position from which to resume scanning a growing buffer for citations.
+
+    Citations ending before this position are complete and have already been
+    found; anything after it may be a citation that is still being streamed.
+    """
+    return max(0, len(text) - _MAX_CITATION_LENGTH + 1)
+
+
+class QueryCoalescer:
+    """
+    Coalesces concurrent single-query calls into one batched call.
+
+    Queries submitted within `window` seconds of the first pending one are
+    passed together to `batch_fn`, which must return one result per query
+    in the same order. Each caller then receives the result for its own
+    query. Identical queries in a batch are only sent once.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[str]], Awaitable[list[Any]]],
+        window: float = 0.005,
+        max_batch_size: int = 64,
+    ):
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._pending: list[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Keep references to running batches so they aren't collected
+        self._batches: Set[asyncio.Task] = set()
+
+    async def submit(self, query: str) -> Any:
+        """Queue a query for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((query, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+
+        batch = asyncio.ensure_future(self._run_batch(pending))
+        self._batches.add(batch)
+        batch.add_done_callback(self._batches.discard)
+
+    async def _run_batch(
+        self, pending: list[Tuple[str, asyncio.Future]]
+    ) -> None:
+        queries = list(dict.fromkeys(query for query, _ in pending))
+        try:
+            results = await self.batch_fn(queries)
+            by_query = dict(zip(queries, results, strict=True))
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            # The batch was cancelled; don't leave its callers waiting forever
+            for _, future in pending:
+                if not future.done():
+                    future.cancel()
+            raise
+
+        for query, future in pending:
+            if not future.done():
+                future.set_result(by_query[query])
+
+
 __all__ = [
     "format_search_results_for_llm",
     "generate_id",
@@ -227,6 +319,7 @@ __all__ = [
     "convert_nonserializable_objects",
     "num_tokens",
     "num_tokens_from_messages",
+    "truncate_to_tokens",
     "SSEFormatter",
     "SearchResultsCollector",
     "update_settings_from_dict",
@@ -238,4 +331,6 @@ __all__ = [
     "extract_citation_spans",
     "CitationTracker",
     "find_new_citation_spans",
+    "next_citation_scan_offset",
+    "QueryCoalescer",
 ]
@@ -3,6 +3,9 @@ import http.client
 import json
 import logging
 import os
+from typing import Optional
+
+import httpx
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +85,31 @@ class SerperClient:
         json_data = json.loads(data.decode("utf-8"))
         return SerperClient._extract_results(json_data)
 
+    async def aget_raw(
+        self,
+        query: str,
+        limit: int = 10,
+        client: Optional[httpx.AsyncClient] = None,
+    ) -> list:
+        """Async variant of `get_raw` that does not block the event loop.
+
+        Pass a shared `client` to reuse pooled connections across calls.
+        """
+        payload = {"q": query, "num_outputs": limit}
+        url = f"https://{self.api_base}/search"
+        if client is None:
+            async with httpx.AsyncClient() as owned_client:
+                response = await owned_client.post(
+                    url, json=payload, headers=self.headers
+                )
+        else:
+            response = await client.post(
+                url, json=payload, headers=self.headers
+            )
+        logger.debug(f"Received response {response} from Serper API.")
+        response.raise_for_status()
+        return SerperClient._extract_results(response.json())
+
     @staticmethod
     def construct_context(results: list) -> str:
         # Organize results by type
@@ -485,6 +485,16 @@ class SearchSettings(R2RSerializable):
         description="Number of sub-queries/hypothetical docs to generate when using hyde or rag_fusion search strategies.",
     )
 
+    batch_concurrent: bool = Field(
+        default=False,
+        description="Whether to batch query embeddings with other searches arriving at the same time, trading a few milliseconds of latency for fewer embedding requests under load.",
+    )
+
+    cache_query_embeddings: bool = Field(
+        default=False,
+        description="Whether to reuse the embedding of an identical query made in the last five minutes instead of embedding it again.",
+    )
+
     class Config:
         populate_by_name = True
         json_encoders = {UUID: str}
@@ -5,11 +5,17 @@ import uuid
 from abc import ABCMeta
 from copy import deepcopy
 from datetime import datetime
+from functools import lru_cache
 from typing import TYPE_CHECKING, Any, Optional, Tuple, TypeVar
 from uuid import NAMESPACE_DNS, UUID, uuid4, uuid5
 
 import tiktoken
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from ..abstractions import (
     AggregateSearchResult,
     AsyncSyncMeta,
@@ -26,8 +32,12 @@ if TYPE_CHECKING:
 logger = logging.getLogger()
 
 
+# Number of leading ID characters that identify a result in citations
+_SHORT_ID_LENGTH = 7
+
+
 def id_to_shorthand(id: str | UUID):
-    return str(id)[:7]
+    return str(id)[:_SHORT_ID_LENGTH]
 
 
 def format_search_results_for_llm(
@@ -280,6 +290,10 @@ class SearchResultsCollector:
     def __init__(self):
         # We'll store a list of (source_type, result_obj)
         self._results_in_order = []
+        # Results, and chunks nested in documents, keyed by their shorthand
+        # ID so that citations resolve without scanning every result
+        self._results_by_short_id: dict[str, list[Any]] = {}
+        self._doc_chunks_by_short_id: dict[str, list[Any]] = {}
 
     @property
     def results(self):
@@ -292,46 +306,93 @@ class SearchResultsCollector:
         Set the results directly, with automatic type detection for 'unknown' items
         Handles the format: [('unknown', {...}), ('unknown', {...})]
         """
+        if not isinstance(value, list):
+            raise ValueError("Results must be a list")
+
         self._results_in_order = []
+        self._results_by_short_id = {}
+        self._doc_chunks_by_short_id = {}
 
-        if isinstance(value, list):
-            for item in value:
-                if isinstance(item, tuple) and len(item) == 2:
-                    source_type, result_obj = item
-
-                    # Only auto-detect if the source type is "unknown"
-                    if source_type == "unknown":
-                        detected_type = self._detect_result_type(result_obj)
-                        self._results_in_order.append(
-                            (detected_type, result_obj)
-                        )
-                    else:
-                        self._results_in_order.append(
-                            (source_type, result_obj)
-                        )
+        for item in value:
+            if isinstance(item, tuple) and len(item) == 2:
+                source_type, result_obj = item
+
+                # Only auto-detect if the source type is "unknown"
+                if source_type == "unknown":
+                    detected_type = self._detect_result_type(result_obj)
+                    self._append(detected_type, result_obj)
                 else:
-                    # If not a tuple, detect and add
-                    detected_type = self._detect_result_type(item)
-                    self._results_in_order.append((detected_type, item))
+                    self._append(source_type, result_obj)
+            else:
+                # If not a tuple, detect and add
+                detected_type = self._detect_result_type(item)
+                self._append(detected_type, item)
+
+    @staticmethod
+    def _get_result_id(obj) -> Optional[str]:
+        """Return the ID of a result or chunk as a string, if it has one."""
+        if isinstance(obj, dict):
+            result_id = obj.get("id")
         else:
-            raise ValueError("Results must be a list")
+            result_id = getattr(obj, "id", None)
+        return str(result_id) if result_id else None
+
+    @staticmethod
+    def _get_doc_chunks(doc) -> list:
+        """Return the chunks nested in a document result, if any."""
+        if isinstance(doc, dict):
+            return doc.get("chunks") or []
+        return getattr(doc, "chunks", None) or []
+
+    def _extend(self, entries: list[Tuple[str, Any]]):
+        """
+        Publish new (source_type, result_obj) entries and index them.
+
+        The entries land with a single list.extend, which is atomic, so tool
+        calls can add results without a lock and readers never see an
+        aggregate that is only partly added.
+        """
+        self._results_in_order.extend(entries)
+        for source_type, result_obj in entries:
+            self._index(source_type, result_obj)
+
+    def _append(self, source_type, result_obj):
+        """Record a single result in order and index it."""
+        self._extend([(source_type, result_obj)])
+
+    def _index(self, source_type, result_obj):
+        """Index a result, and any chunks nested in it, by shorthand ID."""
+        if result_id := self._get_result_id(result_obj):
+            self._results_by_short_id.setdefault(
+                id_to_shorthand(result_id), []
+            ).append(result_obj)
+
+        if source_type == "doc":
+            for chunk in self._get_doc_chunks(result_obj):
+                if chunk_id := self._get_result_id(chunk):
+                    self._doc_chunks_by_short_id.setdefault(
+                        id_to_shorthand(chunk_id), []
+                    ).append(chunk)
 
     def add_aggregate_result(self, agg):
         """
         Flatten the chunk_search_results, graph_search_results, web_search_results,
         and document_search_results into the collector, including nested chunks.
         """
+        # Stage this aggregate's entries locally, then publish them at once
+        entries: list[Tuple[str, Any]] = []
+
         if hasattr(agg, "chunk_search_results") and agg.chunk_search_results:
             for c in agg.chunk_search_results:
-                self._results_in_order.append(("chunk", c))
+                entries.append(("chunk", c))
 
         if hasattr(agg, "graph_search_results") and agg.graph_search_results:
             for g in agg.graph_search_results:
-                self._results_in_order.append(("graph", g))
+                entries.append(("graph", g))
 
         if hasattr(agg, "web_search_results") and agg.web_search_results:
             for w in agg.web_search_results:
-                self._results_in_order.append(("web", w))
+                entries.append(("web", w))
 
         # Add documents and extract their chunks
         if (
@@ -340,7 +401,7 @@ class SearchResultsCollector:
         ):
             for doc in agg.document_search_results:
                 # Add the document itself
-                self._results_in_order.append(("doc", doc))
+                entries.append(("doc", doc))
 
                 # Extract and add chunks from the document
                 chunks = None
@@ -354,9 +415,11 @@ class SearchResultsCollector:
                         # Ensure each chunk has the minimum required attributes
                         if isinstance(chunk, dict) and "id" in chunk:
                             # Add the chunk directly to results for citation lookup
-                            self._results_in_order.append(("chunk", chunk))
+                            entries.append(("chunk", chunk))
                         elif hasattr(chunk, "id"):
-                            self._results_in_order.append(("chunk", chunk))
+                            entries.append(("chunk", chunk))
+
+        self._extend(entries)
 
     def add_result(self, result_obj, source_type=None):
         """
@@ -364,11 +427,11 @@ class SearchResultsCollector:
         If source_type is not provided, automatically detect the type.
         """
         if source_type:
-            self._results_in_order.append((source_type, result_obj))
+            self._append(source_type, result_obj)
             return source_type
 
         detected_type = self._detect_result_type(result_obj)
-        self._results_in_order.append((detected_type, result_obj))
+        self._append(detected_type, result_obj)
         return detected_type
 
     def _detect_result_type(self, obj):
@@ -465,57 +528,55 @@ class SearchResultsCollector:
         # Default when type can't be determined
         return "unknown"
 
+    @staticmethod
+    def _as_source(result_obj):
+        """Convert a result object to a dict where possible."""
+        if isinstance(result_obj, dict):
+            return result_obj
+        if hasattr(result_obj, "as_dict"):
+            return result_obj.as_dict()
+        elif hasattr(result_obj, "model_dump"):
+            return result_obj.model_dump()
+        elif hasattr(result_obj, "dict"):
+            return result_obj.dict()
+        return result_obj
+
     def find_by_short_id(self, short_id):
         """Find a result by its short ID prefix with better chunk handling"""
         if not short_id:
             return None
 
-        # First try direct lookup using regular iteration
+        # Citation IDs are at least as long as the indexed shorthand, so they
+        # resolve through the index; anything shorter falls back to a scan
+        if len(short_id) < _SHORT_ID_LENGTH:
+            return self._scan_by_short_id(short_id)
+
+        key = id_to_shorthand(short_id)
+        for result_obj in self._results_by_short_id.get(key, ()):
+            if self._get_result_id(result_obj).startswith(short_id):
+                return self._as_source(result_obj)
+
+        # If not found, look for chunks nested inside documents
+        for chunk in self._doc_chunks_by_short_id.get(key, ()):
+            if self._get_result_id(chunk).startswith(short_id):
+                return chunk
+
+        return None
+
+    def _scan_by_short_id(self, short_id):
+        """Find a result by short ID by scanning every collected result."""
         for _, result_obj in self._results_in_order:
-            # Check dictionary objects
-            if isinstance(result_obj, dict) and "id" in result_obj:
-                result_id = str(result_obj["id"])
-                if result_id.startswith(short_id):
-                    return result_obj
-
-            # Check object with id attribute
-            elif hasattr(result_obj, "id"):
-                obj_id = getattr(result_obj, "id", None)
-                if obj_id and str(obj_id).startswith(short_id):
-                    # Convert to dict if possible
-                    if hasattr(result_obj, "as_dict"):
-                        return result_obj.as_dict()
-                    elif hasattr(result_obj, "model_dump"):
-                        return result_obj.model_dump()
-                    elif hasattr(result_obj, "dict"):
-                        return result_obj.dict()
-                    else:
-                        return result_obj
+            result_id = self._get_result_id(result_obj)
+            if result_id and result_id.startswith(short_id):
+                return self._as_source(result_obj)
 
-        # If not found, look for chunks inside documents that weren't extracted properly
+        # If not found, look for chunks nested inside documents
         for source_type, result_obj in self._results_in_order:
             if source_type == "doc":
-                # Try various ways to access chunks
-                chunks = None
-                if isinstance(result_obj, dict) and "chunks" in result_obj:
-                    chunks = result_obj["chunks"]
-                elif (
-                    hasattr(result_obj, "chunks")
-                    and result_obj.chunks is not None
-                ):
-                    chunks = result_obj.chunks
-
-                if chunks:
-                    for chunk in chunks:
-                        # Try each chunk
-                        chunk_id = None
-                        if isinstance(chunk, dict) and "id" in chunk:
-                            chunk_id = chunk["id"]
-                        elif hasattr(chunk, "id"):
-                            chunk_id = chunk.id
-
-                        if chunk_id and str(chunk_id).startswith(short_id):
-                            return chunk
+                for chunk in self._get_doc_chunks(result_obj):
+                    chunk_id = self._get_result_id(chunk)
+                    if chunk_id and chunk_id.startswith(short_id):
+                        return chunk
 
         return None
 
@@ -615,20 +676,93 @@ def dump_collector(collector: SearchResultsCollector) -> list[dict[str, Any]]:
     return dumped
 
 
-def num_tokens(text, model="gpt-4o"):
+@lru_cache(maxsize=None)
+def _get_encoding(model: str) -> tiktoken.Encoding:
+    """Return the (cached) tiktoken encoding for a model."""
     try:
-        encoding = tiktoken.encoding_for_model(model)
+        return tiktoken.encoding_for_model(model)
     except KeyError:
-        encoding = tiktoken.get_encoding("cl100k_base")
+        return tiktoken.get_encoding("cl100k_base")
 
-    """Return the number of tokens used by a list of messages for both user and assistant."""
+
+def num_tokens(text, model="gpt-4o"):
+    """Return the number of tokens in `text` for the given model."""
+    encoding = _get_encoding(model)
     return len(encoding.encode(text, disallowed_special=()))
 
 
+def _decode_prefix(encoding: tiktoken.Encoding, tokens: list[int]) -> str:
+    """
+    Decode leading tokens of a text, dropping a multi-byte character that
+    the last token only partly covers so the result is a prefix of the text.
+    """
+    return encoding.decode_bytes(tokens).decode("utf-8", "ignore")
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model="gpt-4o") -> str:
+    """
+    Truncate `text` to at most `max_tokens` tokens, cutting on a token
+    boundary.
+
+    Only a bounded prefix of the text is tokenized when it is clearly over
+    the limit, so the cost scales with `max_tokens` rather than the length
+    of the input.
+    """
+    # Every token covers at least one UTF-8 byte, so text with no more bytes
+    # than `max_tokens` fits without being tokenized at all
+    if len(text) <= max_tokens and (
+        text.isascii() or len(text.encode("utf-8")) <= max_tokens
+    ):
+        return text
+
+    encoding = _get_encoding(model)
+
+    # Tokens average ~4 characters; a prefix of 8 chars per token is almost
+    # always enough to find the cut point without encoding the whole text.
+    prefix_len = max_tokens * 8
+    if len(text) > prefix_len:
+        tokens = encoding.encode(text[:prefix_len], disallowed_special=())
+        # Require one spare token, as the last one may be split by the slice
+        if len(tokens) > max_tokens:
+            return _decode_prefix(encoding, tokens[:max_tokens])
+
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return _decode_prefix(encoding, tokens[:max_tokens])
+
+
 class CombinedMeta(AsyncSyncMeta, ABCMeta):
     pass
 
 
+if orjson is not None:
+    _SSE_ORJSON_OPTIONS = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    )
+
+
+def _dumps_sse_payload(payload: dict) -> str:
+    """
+    Serialize an SSE payload, using orjson when it is installed.
+
+    Datetimes and dataclasses are passed through to `default=str`, so they
+    are written exactly as `json.dumps(payload, default=str)` writes them.
+    Enums that do not subclass str are written as their value.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                payload, default=str, option=_SSE_ORJSON_OPTIONS
+            ).decode()
+        except TypeError:
+            # e.g. integers wider than 64 bits, which json can still encode
+            pass
+    return json.dumps(payload, default=str)
+
+
 async def yield_sse_event(event_name: str, payload: dict, chunk_size=1024):
     """
     Helper that yields a single SSE event in properly chunked lines.
@@ -644,7 +778,7 @@ async def yield_sse_event(event_name: str, payload: dict, chunk_size=1024):
     yield f"event: {event_name}\n"
 
     # Convert payload to JSON
-    content_str = json.dumps(payload, default=str)
+    content_str = _dumps_sse_payload(payload)
 
     # data
     yield f"data: {content_str}\n"
@@ -28,6 +28,29 @@ from conftest import (
 )
 
 
+def make_rag_agent(config=None, search_settings=None, **methods):
+    """
+    Build an R2RRAGAgent on mock providers. Retrieval methods that are not
+    passed in `methods` default to AsyncMocks.
+    """
+    from core.agent.rag import R2RRAGAgent
+    from core.base import SearchSettings
+    from core.base.agent.agent import RAGAgentConfig
+
+    return R2RRAGAgent(
+        database_provider=MockDatabaseProvider(),
+        llm_provider=MockLLMProvider(),
+        config=config or RAGAgentConfig(rag_tools=[]),
+        search_settings=search_settings or SearchSettings(),
+        rag_generation_config=GenerationConfig(model="test/model"),
+        knowledge_search_method=methods.get(
+            "knowledge_search_method", AsyncMock()
+        ),
+        content_method=methods.get("content_method", AsyncMock()),
+        file_search_method=methods.get("file_search_method", AsyncMock()),
+    )
+
+
 @pytest.mark.asyncio
 async def test_streaming_agent_functionality():
     """Test basic functionality of the streaming agent."""
@@ -310,3 +333,416 @@ async def test_conversation_message_format():
     assert "This is a test response with citations" in last_message.content, "Message content should include response"
     assert "metadata" in last_message.dict(), "Message should include metadata"
     assert "citations" in last_message.metadata, "Message metadata should include citations"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("parallel", [True, False])
+async def test_execute_tool_calls(parallel):
+    """Test that tool calls from one turn run concurrently and keep their order."""
+    from core.base.agent import Tool
+
+    # Create mock config
+    config = MagicMock()
+    config.stream = True
+    config.parallel_tool_calls = parallel
+
+    agent = MockR2RStreamingAgent(
+        database_provider=MockDatabaseProvider(),
+        llm_provider=MockLLMProvider(),
+        config=config,
+        rag_generation_config=GenerationConfig(model="test/model")
+    )
+
+    in_flight = 0
+    max_in_flight = 0
+
+    async def slow_search(query, *args, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return f"result for {query}"
+
+    agent.tools = [
+        Tool(
+            name="search",
+            description="Test search tool",
+            results_function=slow_search,
+            llm_format_function=lambda result: result,
+            parameters={"type": "object", "properties": {"query": {"type": "string"}}},
+        )
+    ]
+
+    calls_list = [
+        {"tool_call_id": f"call_{i}", "name": "search", "arguments": json.dumps({"query": f"q{i}"})}
+        for i in range(3)
+    ]
+    results = await agent._execute_tool_calls(calls_list)
+
+    # Results are returned in call order regardless of completion order
+    assert [r.raw_result for r in results] == ["result for q0", "result for q1", "result for q2"]
+    assert max_in_flight == (3 if parallel else 1)
+
+    # Each call still records a tool message in the conversation
+    tool_messages = [m for m in agent.conversation.messages if str(m.role) == "tool"]
+    assert sorted(m.tool_call_id for m in tool_messages) == ["call_0", "call_1", "call_2"]
+
+
+@pytest.mark.asyncio
+async def test_dedup_inflight_tool_calls():
+    """Test that identical tool calls on one agent share a single execution."""
+    from collections import OrderedDict
+    from core.agent.rag import _dedup_inflight
+
+    class DummyAgent:
+        def __init__(self):
+            self._tool_cache = OrderedDict()
+            self.calls = 0
+
+        @_dedup_inflight
+        async def search(self, query, *args, **kwargs):
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            if query == "fail":
+                raise RuntimeError("search failed")
+            return f"result for {query}"
+
+    agent = DummyAgent()
+
+    # Concurrent identical calls run once
+    results = await asyncio.gather(*(agent.search(query="q") for _ in range(3)))
+    assert results == ["result for q"] * 3
+    assert agent.calls == 1
+
+    # A later identical call is served from the cache, a new one is executed
+    assert await agent.search(query="q") == "result for q"
+    assert await agent.search(query="other") == "result for other"
+    assert agent.calls == 2
+
+    # Failures are not cached
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await agent.search(query="fail")
+    assert agent.calls == 4
+
+
+@pytest.mark.asyncio
+async def test_dedup_inflight_cancellation():
+    """Test that a tool call is cancelled once all of its callers are."""
+    from collections import OrderedDict
+    from core.agent.rag import _dedup_inflight
+
+    class DummyAgent:
+        def __init__(self):
+            self._tool_cache = OrderedDict()
+            self.started = 0
+            self.finished = 0
+
+        @_dedup_inflight
+        async def search(self, query, *args, **kwargs):
+            self.started += 1
+            await asyncio.sleep(0.05)
+            self.finished += 1
+            return f"result for {query}"
+
+    agent = DummyAgent()
+
+    # A lone caller being cancelled stops the work and leaves no cache entry
+    task = asyncio.ensure_future(agent.search(query="q"))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.sleep(0.1)
+    assert agent.started == 1
+    assert agent.finished == 0
+    assert not agent._tool_cache
+
+    # With another caller still waiting, the shared call keeps running
+    first = asyncio.ensure_future(agent.search(query="q"))
+    second = asyncio.ensure_future(agent.search(query="q"))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    assert await second == "result for q"
+    assert agent.started == 2
+    assert agent.finished == 1
+    assert await agent.search(query="q") == "result for q"
+    assert agent.started == 2
+
+
+@pytest.mark.asyncio
+async def test_sse_event_payload_serialization():
+    """Test that SSE payloads with non-JSON types serialize to valid JSON."""
+    from uuid import uuid4
+    from shared.utils.base_utils import yield_sse_event
+
+    doc_id = uuid4()
+    payload = {"id": doc_id, "text": "café [abc1234]", "scores": [0.5, 1]}
+
+    lines = [line async for line in yield_sse_event("message", payload)]
+
+    assert lines[0] == "event: message\n"
+    assert lines[-1] == "\n"
+    data = json.loads(lines[1][len("data: "):])
+    assert data == {"id": str(doc_id), "text": "café [abc1234]", "scores": [0.5, 1]}
+
+
+def test_sse_payload_matches_json_default_str():
+    """Test that datetimes and dataclasses keep their json.dumps format."""
+    from dataclasses import dataclass
+    from datetime import date, datetime, timezone
+    from shared.utils.base_utils import _dumps_sse_payload
+
+    @dataclass
+    class Point:
+        x: int
+
+    payload = {
+        "created_at": datetime(2024, 1, 1, 12, 0, tzinfo=timezone.utc),
+        "day": date(2024, 1, 1),
+        "point": Point(1),
+    }
+
+    assert json.loads(_dumps_sse_payload(payload)) == json.loads(
+        json.dumps(payload, default=str)
+    )
+    assert '"2024-01-01 12:00:00+00:00"' in _dumps_sse_payload(payload)
+
+
+@pytest.mark.asyncio
+async def test_file_knowledge_search_batch():
+    """Test that batched knowledge searches run together and merge results."""
+    from uuid import uuid4
+    from core.base.abstractions import AggregateSearchResult, ChunkSearchResult
+    from core.base.agent.agent import RAGAgentConfig
+
+    document_id = uuid4()
+    shared_chunk = ChunkSearchResult(
+        id=uuid4(), document_id=document_id, owner_id=None,
+        collection_ids=[], text="shared chunk", metadata={},
+    )
+    seen_settings = []
+
+    async def knowledge_search(query, search_settings):
+        seen_settings.append(search_settings)
+        own_chunk = ChunkSearchResult(
+            id=uuid4(), document_id=document_id, owner_id=None,
+            collection_ids=[], text=f"chunk for {query}", metadata={},
+        )
+        return AggregateSearchResult(
+            chunk_search_results=[shared_chunk, own_chunk],
+            graph_search_results=[],
+        )
+
+    agent = make_rag_agent(
+        config=RAGAgentConfig(rag_tools=["search_file_knowledge_batch"]),
+        knowledge_search_method=knowledge_search,
+    )
+    assert [t.name for t in agent.tools] == ["search_file_knowledge_batch"]
+
+    result = await agent._file_knowledge_search_batch(queries=["a", "b", "a"])
+
+    # Duplicate queries run once, and chunks returned twice appear once
+    assert len(seen_settings) == 2
+    assert all(s.batch_concurrent for s in seen_settings)
+    assert not agent.search_settings.batch_concurrent
+    assert [c.text for c in result.chunk_search_results] == [
+        "shared chunk", "chunk for a", "chunk for b",
+    ]
+    assert agent.search_results_collector.find_by_short_id(str(shared_chunk.id)[:7])
+
+    # A bare string is one query, not one search per character
+    seen_settings.clear()
+    result = await agent._file_knowledge_search_batch(queries="abc")
+    assert len(seen_settings) == 1
+    assert [c.text for c in result.chunk_search_results] == [
+        "shared chunk", "chunk for abc",
+    ]
+
+    # Too many distinct queries in one call are rejected
+    from core.agent.rag import _MAX_BATCH_QUERIES
+
+    seen_settings.clear()
+    with pytest.raises(ValueError):
+        await agent._file_knowledge_search_batch(
+            queries=[f"q{i}" for i in range(_MAX_BATCH_QUERIES + 1)]
+        )
+    assert not seen_settings
+
+
+@pytest.mark.asyncio
+async def test_file_knowledge_search_legacy_dict_responses():
+    """Test that dict search responses are only converted when enabled."""
+    from core.base.abstractions import AggregateSearchResult
+    from core.base.agent.agent import RAGAgentConfig
+
+    async def knowledge_search(query, search_settings):
+        return {"chunk_search_results": [], "graph_search_results": []}
+
+    legacy_agent = make_rag_agent(
+        config=RAGAgentConfig(rag_tools=[], legacy_dict_responses=True),
+        knowledge_search_method=knowledge_search,
+    )
+    result = await legacy_agent._file_knowledge_search_function(query="q")
+    assert isinstance(result, AggregateSearchResult)
+
+    agent = make_rag_agent(knowledge_search_method=knowledge_search)
+    raw = await knowledge_search("q", None)
+    assert agent._as_aggregate_search_result(raw) is raw
+
+
+def test_http_client_per_event_loop():
+    """Test that each event loop gets its own web tools HTTP client."""
+    from core.agent.rag import _get_http_client, aclose_http_client
+
+    async def get_client():
+        client = _get_http_client()
+        assert _get_http_client() is client
+        return client
+
+    async def get_and_close_client():
+        client = _get_http_client()
+        await aclose_http_client()
+        return client
+
+    first = asyncio.run(get_client())
+    second = asyncio.run(get_and_close_client())
+    assert first is not second
+    assert second.is_closed
+
+
+@pytest.mark.asyncio
+async def test_serper_aget_raw(monkeypatch):
+    """Test the async Serper request, including non-2xx responses."""
+    import httpx
+    from core.utils.serper import SerperClient
+
+    monkeypatch.setenv("SERPER_API_KEY", "serper-key")
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if json.loads(request.content)["q"] == "fail":
+            return httpx.Response(500, json={"message": "error"})
+        return httpx.Response(
+            200,
+            json={
+                "searchParameters": {"q": "aristotle"},
+                "organic": [{"title": "Aristotle", "link": "https://a.org"}],
+            },
+        )
+
+    serper = SerperClient()
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(handler)
+    ) as client:
+        results = await serper.aget_raw("aristotle", client=client)
+        with pytest.raises(httpx.HTTPStatusError):
+            await serper.aget_raw("fail", client=client)
+
+    assert results == [
+        {"title": "Aristotle", "link": "https://a.org", "type": "organic"}
+    ]
+    assert str(requests[0].url) == "https://google.serper.dev/search"
+    assert requests[0].headers["X-API-KEY"] == "serper-key"
+
+
+@pytest.mark.asyncio
+async def test_web_scrape_firecrawl(monkeypatch):
+    """Test the Firecrawl REST call, its `data` unwrapping and errors."""
+    import httpx
+    from core.agent import rag
+
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        if json.loads(request.content)["url"] == "https://fail.org":
+            return httpx.Response(402, json={"error": "payment required"})
+        return httpx.Response(
+            200,
+            json={
+                "success": True,
+                "data": {
+                    "markdown": "# Aristotle",
+                    "metadata": {"title": "Aristotle"},
+                },
+            },
+        )
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(rag, "_get_http_client", lambda: client)
+
+    agent = make_rag_agent()
+
+    # The hosted API needs a key, a self-hosted instance does not
+    monkeypatch.delenv("FIRECRAWL_API_KEY", raising=False)
+    monkeypatch.delenv("FIRECRAWL_API_URL", raising=False)
+    with pytest.raises(ValueError):
+        await agent._web_scrape_function(url="https://a.org")
+
+    monkeypatch.setenv("FIRECRAWL_API_URL", "http://firecrawl.local/")
+    result = await agent._web_scrape_function(url="https://a.org")
+    assert str(requests[0].url) == "http://firecrawl.local/v1/scrape"
+    assert "Authorization" not in requests[0].headers
+
+    web_result = result.web_search_results[0]
+    assert web_result.title == "Aristotle"
+    assert web_result.snippet == "# Aristotle"
+    assert web_result.link == "https://a.org"
+
+    monkeypatch.setenv("FIRECRAWL_API_KEY", "fc-key")
+    with pytest.raises(httpx.HTTPStatusError):
+        await agent._web_scrape_function(url="https://fail.org")
+    assert requests[1].headers["Authorization"] == "Bearer fc-key"
+    await client.aclose()
+
+
+def test_tavily_extract_across_event_loops():
+    """Test that blocking Tavily calls can run on more than one loop."""
+    agent = make_rag_agent()
+    agent._tavily_client = MagicMock()
+    agent._tavily_client.extract.side_effect = lambda url, **kwargs: (
+        MagicMock(results=[MagicMock(url=url, raw_content="page")])
+    )
+
+    async def extract_concurrently(prefix):
+        return await asyncio.gather(
+            *(
+                agent._tavily_extract_function(url=f"https://{prefix}{i}.org")
+                for i in range(40)
+            )
+        )
+
+    for prefix in ("a", "b"):
+        results = asyncio.run(extract_concurrently(prefix))
+        assert results[-1].web_search_results[0].link == f"https://{prefix}39.org"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "global_filters",
+    [{}, {"owner_id": {"$eq": "11111111-1111-1111-1111-111111111111"}}],
+)
+async def test_content_function_scoped_by_search_filters(global_filters):
+    """Test that get_file_content is restricted by the caller's filters."""
+    from copy import deepcopy
+    from uuid import uuid4
+    from core.base import SearchSettings
+
+    content_method = AsyncMock(return_value=[])
+    search_settings = SearchSettings(filters=deepcopy(global_filters))
+    agent = make_rag_agent(
+        search_settings=search_settings, content_method=content_method
+    )
+
+    document_id = uuid4()
+    await agent._content_function(document_id=str(document_id))
+
+    id_filter = {"id": {"$eq": document_id}}
+    expected = (
+        {"$and": [id_filter, global_filters]} if global_filters else id_filter
+    )
+    content_method.assert_awaited_once_with(expected, {})
+    assert search_settings.filters == global_filters
@@ -869,6 +869,66 @@ class TestCitationUtils:
         assert "def5678" in citation_ids, "Second citation should be found"
         assert "ghi9012" in citation_ids, "Third citation should be found"
 
+    def test_core_find_new_citation_spans_incremental(self):
+        """Test scanning a streamed buffer from the last scan offset."""
+        from core.utils import find_new_citation_spans as core_find_new_spans
+        from core.utils import next_citation_scan_offset
+
+        tracker = CoreCitationTracker()
+        chunks = ["Intro [abc12", "34] then [def5", "678] and [abc1234]."]
+
+        buffer = ""
+        offset = 0
+        found = []
+        for chunk in chunks:
+            buffer += chunk
+            new_spans = core_find_new_spans(buffer, tracker, start=offset)
+            offset = next_citation_scan_offset(buffer)
+            for cid, spans in new_spans.items():
+                found.extend((cid, span) for span in spans)
+
+        # Citations split across chunks are still found, each exactly once
+        assert found == [
+            ("abc1234", (6, 15)),
+            ("def5678", (21, 30)),
+            ("abc1234", (35, 44)),
+        ]
+
+    def test_collector_find_by_short_id(self):
+        """Test resolving citation short IDs against collected results."""
+        from core.utils import SearchResultsCollector
+
+        collector = SearchResultsCollector()
+        collector.add_result(
+            {"id": "abc12345-0000", "text": "first", "score": 0.9}, "chunk"
+        )
+        collector.add_result(
+            {"id": "abc12349-0000", "text": "second", "score": 0.8}, "chunk"
+        )
+        collector.add_result(
+            {
+                "id": "doc00000-0000",
+                "document": {},
+                "chunks": [{"id": "def67890-0000", "text": "nested"}],
+            },
+            "doc",
+        )
+
+        # 7 and 8 character citation IDs sharing a shorthand
+        assert collector.find_by_short_id("abc1234")["text"] == "first"
+        assert collector.find_by_short_id("abc12349")["text"] == "second"
+        # Chunks nested inside documents
+        assert collector.find_by_short_id("def6789")["text"] == "nested"
+        # Shorter prefixes still resolve, unknown IDs do not
+        assert collector.find_by_short_id("abc")["text"] == "first"
+        assert collector.find_by_short_id("zzz9999") is None
+        assert collector.find_by_short_id("") is None
+
+        # Replacing the results rebuilds the lookup
+        collector.results = [("chunk", {"id": "fff11111", "text": "new", "score": 1})]
+        assert collector.find_by_short_id("abc1234") is None
+        assert collector.find_by_short_id("fff1111")["text"] == "new"
+
 
     def test_performance_with_many_citations(self):
         """Test performance with a large number of citations."""
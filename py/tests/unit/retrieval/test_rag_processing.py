@@ -946,6 +946,45 @@ class TestRAGContextTruncation:
         chunk_count = context.count("search result")
         assert 1 <= chunk_count <= 3, "Mixed strategy should limit results appropriately"
 
+    def test_truncate_to_tokens(self, mock_search_results):
+        """Test that tool context is truncated on a token boundary."""
+        from core.utils import num_tokens, truncate_to_tokens
+
+        context = "\n\n".join(
+            r["text"] for r in mock_search_results["chunk_search_results"]
+        )
+
+        # Context that already fits is returned unchanged
+        assert truncate_to_tokens(context, 10_000) == context
+        assert truncate_to_tokens(context, len(context)) == context
+
+        # Multi-byte characters can take several tokens each, so a short
+        # non-ASCII text is still tokenized and truncated
+        emoji = "\U0001f9ea" * 10
+        assert num_tokens(truncate_to_tokens(emoji, len(emoji))) <= len(emoji)
+
+        # A cut inside a multi-byte character drops it rather than leaving
+        # a replacement character, so the result stays a prefix
+        for text in (
+            "Results: " + "\U0001f9ea" * 50,
+            "\u4e9a\u91cc\u58eb\u591a\u5fb7\u8ba8\u8bba\u4e86\u7f8e\u5fb7" * 20,
+        ):
+            for limit in range(1, 60):
+                truncated = truncate_to_tokens(text, limit)
+                assert "\ufffd" not in truncated
+                assert text.startswith(truncated)
+
+        # Short limit only uses the bounded-prefix path
+        truncated = truncate_to_tokens(context * 20, 5)
+        assert num_tokens(truncated) <= 5
+        assert (context * 20).startswith(truncated)
+
+        # Limit close to the full size falls back to encoding everything
+        total = num_tokens(context)
+        truncated = truncate_to_tokens(context, total - 1)
+        assert num_tokens(truncated) <= total - 1
+        assert context.startswith(truncated)
+
 
 class TestAdvancedCitationHandling:
     """Tests for advanced citation handling in RAG."""
@@ -1353,3 +1392,119 @@ class TestRAGRetrievalStrategies:
 
         # Check the response
         assert response == "LLM generated response"
+
+
+class TestQueryCoalescer:
+    """Tests for batching concurrent query embeddings."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_share_one_batch(self):
+        """Test that concurrent queries are sent in one batch call."""
+        import asyncio
+        from core.utils import QueryCoalescer
+
+        batches = []
+
+        async def embed_batch(queries):
+            batches.append(list(queries))
+            return [[float(len(q))] for q in queries]
+
+        coalescer = QueryCoalescer(embed_batch)
+        results = await asyncio.gather(
+            coalescer.submit("a"), coalescer.submit("bb"), coalescer.submit("a")
+        )
+
+        assert results == [[1.0], [2.0], [1.0]]
+        # Duplicate queries are only embedded once
+        assert batches == [["a", "bb"]]
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_propagates_to_callers(self):
+        """Test that a failed batch raises for every waiting caller."""
+        import asyncio
+        from core.utils import QueryCoalescer
+
+        async def embed_batch(queries):
+            raise RuntimeError("embedding failed")
+
+        coalescer = QueryCoalescer(embed_batch)
+        results = await asyncio.gather(
+            coalescer.submit("a"), coalescer.submit("b"), return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_batch_releases_callers(self):
+        """Test that callers don't hang when their batch is cancelled."""
+        import asyncio
+        from core.utils import QueryCoalescer
+
+        async def cancelled_batch(queries):
+            raise asyncio.CancelledError()
+
+        coalescer = QueryCoalescer(cancelled_batch)
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(coalescer.submit("a"), timeout=1)
+
+        async def slow_batch(queries):
+            await asyncio.sleep(10)
+
+        coalescer = QueryCoalescer(slow_batch)
+        waiter = asyncio.ensure_future(coalescer.submit("a"))
+        await asyncio.sleep(0.02)
+        for batch in list(coalescer._batches):
+            batch.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(waiter, timeout=1)
+
+
+class TestQueryEmbeddingCache:
+    """Tests for reusing recent query embeddings."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_query_is_embedded_once(self):
+        """Test that a repeated query reuses the cached embedding."""
+        from collections import OrderedDict
+        from core.main.services.retrieval_service import RetrievalService
+
+        service = MagicMock()
+        service._query_embedding_cache = OrderedDict()
+        service.providers.completion_embedding.async_get_embedding = (
+            AsyncMock(side_effect=lambda text: [0.1, 0.2])
+        )
+        embed = service.providers.completion_embedding.async_get_embedding
+        settings = SearchSettings(cache_query_embeddings=True)
+
+        first = await RetrievalService._embed_query(service, "q", settings)
+        second = await RetrievalService._embed_query(service, "q", settings)
+        await RetrievalService._embed_query(service, "other", settings)
+
+        assert first == second == [0.1, 0.2]
+        assert embed.await_count == 2
+
+        # Callers never share the cached embedding
+        second.append(0.3)
+        third = await RetrievalService._embed_query(service, "q", settings)
+        assert third == [0.1, 0.2]
+        assert embed.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_disabled_by_default(self):
+        """Test that embeddings are not cached unless enabled."""
+        from collections import OrderedDict
+        from core.main.services.retrieval_service import RetrievalService
+
+        service = MagicMock()
+        service._query_embedding_cache = OrderedDict()
+        service.providers.completion_embedding.async_get_embedding = (
+            AsyncMock(return_value=[0.1, 0.2])
+        )
+        settings = SearchSettings()
+
+        await RetrievalService._embed_query(service, "q", settings)
+        await RetrievalService._embed_query(service, "q", settings)
+
+        embed = service.providers.completion_embedding.async_get_embedding
+        assert embed.await_count == 2
+        assert not service._query_embedding_cache